@@ -4,7 +4,11 @@ JWT token issuance, bcrypt password hashing, subscription tier gates.
 """
 
 import os
+import time
+import asyncio
 import logging
+from collections import OrderedDict
+from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
 from typing import Optional
 
@@ -12,9 +16,10 @@ from fastapi import Depends, HTTPException, Security, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from jose import JWTError, jwt
 from passlib.context import CryptContext
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.orm import Session
 
-from database import get_db
+import database
 from user_db import SubscriptionTier, User, AnalysisUsage
 
 logger = logging.getLogger(__name__)
@@ -24,8 +29,16 @@ SECRET_KEY   = os.getenv("JWT_SECRET_KEY", "helioscope-dev-secret-change-in-prod
 ALGORITHM    = "HS256"
 TOKEN_DAYS   = 7
 FREE_QUOTA   = 3   # analyses per calendar month on free tier
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "10"))   # 2^10 ≈ 60-100 ms per verify
 
-pwd_context  = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=12)
+# min == max == default: needs_update() flags any stored hash whose cost differs
+# from BCRYPT_ROUNDS (in either direction), so authenticate_user re-hashes it
+pwd_context  = CryptContext(
+    schemes=["bcrypt"], deprecated="auto",
+    bcrypt__default_rounds=BCRYPT_ROUNDS,
+    bcrypt__min_rounds=BCRYPT_ROUNDS,
+    bcrypt__max_rounds=BCRYPT_ROUNDS,
+)
 security     = HTTPBearer(auto_error=False)
 
 
@@ -45,29 +58,135 @@ def create_access_token(user_id: int, email: str, tier: str) -> str:
         SECRET_KEY, algorithm=ALGORITHM
     )
 
+# Decoded-token cache — the same bearer token is presented on every request,
+# so skip the HMAC verify + JSON parse until shortly before it expires.
+TOKEN_CACHE_SIZE = 10_000
+TOKEN_CACHE_TTL  = 60        # seconds a decoded payload is trusted
+_token_cache: "OrderedDict[str, tuple[dict, float]]" = OrderedDict()
+
+
 def _decode(token: str) -> dict:
+    now = time.time()
+    hit = _token_cache.get(token)
+    if hit is not None:
+        payload, valid_until = hit
+        if now < valid_until:
+            _token_cache.move_to_end(token)
+            return payload
+        del _token_cache[token]
+
     try:
-        return jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
     except JWTError:
         return {}
 
+    exp = payload.get("exp")
+    valid_until = now + TOKEN_CACHE_TTL
+    if exp is not None:
+        valid_until = min(valid_until, float(exp) - 5)
+    if valid_until > now:
+        _token_cache[token] = (payload, valid_until)
+        if len(_token_cache) > TOKEN_CACHE_SIZE:
+            _token_cache.popitem(last=False)
+    return payload
+
+
+# ── User snapshot cache ───────────────────────────────────────────────────────
+# Every authenticated request needs only id/email/tier/is_active, so keep a
+# detached snapshot per user instead of re-querying Postgres each time.
+USER_CACHE_SIZE = 5_000
+USER_CACHE_TTL  = 30         # seconds
+
+@dataclass(frozen=True)
+class CachedUser:
+    """Detached, read-only view of a User row (safe to share across sessions)."""
+    id:        int
+    email:     str
+    full_name: Optional[str]
+    tier:      SubscriptionTier
+    is_active: bool
+
+
+_user_cache: "OrderedDict[int, tuple[CachedUser, float]]" = OrderedDict()
+# Bumped by invalidate_user, so a load that started before a User-row change
+# can tell its snapshot may be stale.  Like _user_cache, touched on the loop only.
+_user_generation: dict[int, int] = {}
+
+
+def _cache_user(user: CachedUser, generation: int) -> CachedUser:
+    """Cache a snapshot loaded at `generation`, unless the user was invalidated since."""
+    if _user_generation.get(user.id, 0) == generation:
+        _user_cache[user.id] = (user, time.time() + USER_CACHE_TTL)
+        _user_cache.move_to_end(user.id)
+        if len(_user_cache) > USER_CACHE_SIZE:
+            _user_cache.popitem(last=False)
+    return user
+
+
+def _cached_user(uid: int) -> Optional[CachedUser]:
+    hit = _user_cache.get(uid)
+    if hit is None:
+        return None
+    user, valid_until = hit
+    if time.time() >= valid_until:
+        _user_cache.pop(uid, None)
+        return None
+    _user_cache.move_to_end(uid)
+    return user
+
+
+def invalidate_user(user_id: int) -> None:
+    """
+    Drop a cached user snapshot — call after any change to the User row, from
+    the event loop (never a threadpool route or worker thread).
+    """
+    _user_generation[user_id] = _user_generation.get(user_id, 0) + 1
+    _user_cache.pop(user_id, None)
+
 
 # ── FastAPI dependencies ──────────────────────────────────────────────────────
 async def get_current_user(
     creds: Optional[HTTPAuthorizationCredentials] = Security(security),
-    db: Session = Depends(get_db),
-) -> Optional[User]:
-    """Returns the authenticated User row, or None if no/invalid token."""
+) -> Optional[CachedUser]:
+    """
+    Returns a snapshot of the authenticated user, or None if no/invalid token.
+    Endpoints that modify the user must load the ORM row via db.get(User, user.id).
+
+    Deliberately not Depends(get_db): a pooled connection is checked out only
+    on a user-cache miss, and returned as soon as the lookup finishes.
+    """
     if creds is None:
         return None
     payload = _decode(creds.credentials)
     uid = payload.get("sub")
-    if not uid or db is None:
+    if not uid:
+        return None
+    uid = int(uid)
+    cached = _cached_user(uid)
+    if cached is not None:
+        return cached
+    if database.SessionLocal is None:
         return None
-    return db.query(User).filter(User.id == int(uid), User.is_active == True).first()
+    # Sync driver — run the lookup in a worker thread, off the event loop;
+    # the cache is only read or written on the loop, never in the thread
+    generation = _user_generation.get(uid, 0)
+    user = await asyncio.to_thread(_load_user, uid)
+    return _cache_user(user, generation) if user is not None else None
 
 
-async def require_auth(user: Optional[User] = Depends(get_current_user)) -> User:
+def _load_user(uid: int) -> Optional[CachedUser]:
+    """Fetch an active user's snapshot (blocking DB round-trip, no shared state)."""
+    # Only the snapshot columns — skips hashed_password + ORM identity-map work
+    with database.SessionLocal() as db:
+        row = (
+            db.query(User.id, User.email, User.full_name, User.tier, User.is_active)
+            .filter(User.id == uid, User.is_active == True)
+            .first()
+        )
+    return CachedUser(row.id, row.email, row.full_name, row.tier, bool(row.is_active)) if row else None
+
+
+async def require_auth(user: Optional[CachedUser] = Depends(get_current_user)) -> CachedUser:
     """Raises 401 if unauthenticated."""
     if user is None:
         raise HTTPException(
@@ -78,7 +197,7 @@ async def require_auth(user: Optional[User] = Depends(get_current_user)) -> User
     return user
 
 
-async def require_pro(user: User = Depends(require_auth)) -> User:
+async def require_pro(user: CachedUser = Depends(require_auth)) -> CachedUser:
     """Raises 403 if not Pro or Enterprise."""
     if user.tier not in (SubscriptionTier.pro, SubscriptionTier.enterprise):
         raise HTTPException(
@@ -88,7 +207,7 @@ async def require_pro(user: User = Depends(require_auth)) -> User:
     return user
 
 
-async def require_enterprise(user: User = Depends(require_auth)) -> User:
+async def require_enterprise(user: CachedUser = Depends(require_auth)) -> CachedUser:
     """Raises 403 if not Enterprise."""
     if user.tier != SubscriptionTier.enterprise:
         raise HTTPException(
@@ -99,8 +218,24 @@ async def require_enterprise(user: User = Depends(require_auth)) -> User:
 
 
 # ── Usage quota ───────────────────────────────────────────────────────────────
+_ym_cache: tuple[str, float] = ("", 0.0)   # ("YYYY-MM", start of next UTC month)
+
+
+def _year_month() -> str:
+    """Current UTC "YYYY-MM"; cached until the next UTC month starts."""
+    global _ym_cache
+    ym, valid_until = _ym_cache
+    if time.time() < valid_until:
+        return ym
+    now = datetime.now(timezone.utc)
+    ym = f"{now.year:04d}-{now.month:02d}"
+    year, month = (now.year + 1, 1) if now.month == 12 else (now.year, now.month + 1)
+    _ym_cache = (ym, datetime(year, month, 1, tzinfo=timezone.utc).timestamp())
+    return ym
+
+
 def get_usage_this_month(db: Session, user_id: int) -> int:
-    ym = datetime.now(timezone.utc).strftime("%Y-%m")
+    ym = _year_month()
     record = db.query(AnalysisUsage).filter(
         AnalysisUsage.user_id == user_id, AnalysisUsage.year_month == ym
     ).first()
@@ -108,20 +243,23 @@ def get_usage_this_month(db: Session, user_id: int) -> int:
 
 
 def increment_usage(db: Session, user_id: int) -> int:
-    ym = datetime.now(timezone.utc).strftime("%Y-%m")
-    record = db.query(AnalysisUsage).filter(
-        AnalysisUsage.user_id == user_id, AnalysisUsage.year_month == ym
-    ).first()
-    if record:
-        record.count += 1
-    else:
-        record = AnalysisUsage(user_id=user_id, year_month=ym, count=1)
-        db.add(record)
+    """Atomic UPSERT — one round-trip, no lost increments under concurrency."""
+    ym = _year_month()
+    stmt = (
+        pg_insert(AnalysisUsage)
+        .values(user_id=user_id, year_month=ym, count=1)
+        .on_conflict_do_update(
+            index_elements=["user_id", "year_month"],
+            set_={"count": AnalysisUsage.count + 1},
+        )
+        .returning(AnalysisUsage.count)
+    )
+    count = db.execute(stmt).scalar_one()
     db.commit()
-    return record.count
+    return count
 
 
-def check_free_quota(db: Session, user: User) -> None:
+def check_free_quota(db: Session, user: CachedUser) -> None:
     """Raises 403 if free-tier user exceeded 3 analyses/month."""
     if user.tier != SubscriptionTier.free:
         return
@@ -154,4 +292,8 @@ def authenticate_user(db: Session, email: str, password: str) -> User:
         raise HTTPException(status_code=401, detail="Invalid email or password.")
     if not user.is_active:
         raise HTTPException(status_code=403, detail="Account is disabled.")
+    # Re-hash on login when BCRYPT_ROUNDS changed since the hash was stored
+    if pwd_context.needs_update(user.hashed_password):
+        user.hashed_password = hash_password(password)
+        db.commit()
     return user
@@ -4,12 +4,13 @@ SQLAlchemy models + session management for storing analysis results.
 """
 
 import os
+import asyncio
 import logging
 from datetime import datetime, timezone
 
 from sqlalchemy import (
     create_engine, Column, Integer, Float, String,
-    DateTime, Text, Boolean
+    DateTime, Text, Boolean, Index, text
 )
 from sqlalchemy.orm import DeclarativeBase, sessionmaker, Session
 from sqlalchemy.exc import OperationalError
@@ -53,6 +54,7 @@ def init_db():
         )
         SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
         Base.metadata.create_all(bind=engine)
+        _ensure_usage_unique_key()
         logger.info("✅ Database connected and tables created.")
         return True
     except OperationalError as e:
@@ -60,6 +62,45 @@ def init_db():
         return False
 
 
+# create_all never alters an existing table, so databases created before
+# AnalysisUsage gained uq_usage_user_month (the increment_usage ON CONFLICT
+# target) get it here: duplicate (user_id, year_month) rows are folded into
+# the oldest one, counts summed, then the constraint is added.  No-op once
+# the constraint exists.
+_USAGE_UNIQUE_KEY_SQL = """
+DO $$
+BEGIN
+  IF to_regclass('analysis_usage') IS NOT NULL AND NOT EXISTS (
+      SELECT 1 FROM pg_constraint WHERE conname = 'uq_usage_user_month') THEN
+    LOCK TABLE analysis_usage IN SHARE ROW EXCLUSIVE MODE;
+    UPDATE analysis_usage a SET count = d.total
+      FROM (SELECT MIN(id) AS keep_id, SUM(COALESCE(count, 0)) AS total
+              FROM analysis_usage
+             GROUP BY user_id, year_month
+            HAVING COUNT(*) > 1) d
+     WHERE a.id = d.keep_id;
+    DELETE FROM analysis_usage a
+     USING analysis_usage b
+     WHERE a.user_id = b.user_id AND a.year_month = b.year_month AND a.id > b.id;
+    ALTER TABLE analysis_usage
+      ADD CONSTRAINT uq_usage_user_month UNIQUE (user_id, year_month);
+  END IF;
+END $$;
+"""
+
+
+def _ensure_usage_unique_key() -> None:
+    """Add uq_usage_user_month to a pre-existing analysis_usage table (Postgres only)."""
+    if engine.dialect.name != "postgresql":
+        return
+    try:
+        with engine.begin() as conn:
+            conn.execute(text(_USAGE_UNIQUE_KEY_SQL))
+    except Exception as e:
+        # e.g. another replica added it concurrently — re-checked next startup
+        logger.error(f"Could not ensure uq_usage_user_month on analysis_usage: {e}")
+
+
 def get_db():
     """FastAPI dependency — yields a DB session, or None if DB is unavailable."""
     if SessionLocal is None:
@@ -81,7 +122,7 @@ class AnalysisResult(Base):
     """Stores each placement analysis run."""
     __tablename__ = "analysis_results"
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)   # PK btree is implicit
     created_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
 
     # Location
@@ -116,11 +157,16 @@ class AnalysisResult(Base):
     ai_provider = Column(String(50))
 
 
+# Serves get_recent_analyses (ORDER BY created_at DESC LIMIT n) and the
+# calibrator's 180-day window scan without a sort.
+Index("ix_analysis_results_created_at", AnalysisResult.created_at.desc())
+
+
 class SavedLocation(Base):
     """User-saved locations for future reference."""
     __tablename__ = "saved_locations"
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)   # PK btree is implicit
     created_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
     name = Column(String(255), nullable=False)
     lat = Column(Float, nullable=False)
@@ -147,6 +193,110 @@ def save_analysis(db: Session, data: dict) -> AnalysisResult | None:
         return None
 
 
+# ── Batched analysis writer ───────────────────────────────────────────────────
+# /api/analyze and /api/analyze-placement hand their row to a queue instead of
+# committing inline; a background task drains it and inserts up to
+# ANALYSIS_BATCH_SIZE rows per transaction (one executemany) in a worker thread,
+# so requests never wait on the INSERT round-trip.
+ANALYSIS_BATCH_SIZE = 100
+ANALYSIS_FLUSH_INTERVAL_S = 0.5
+ANALYSIS_QUEUE_MAX = 10_000
+
+_analysis_queue: asyncio.Queue | None = None
+_analysis_writer: asyncio.Task | None = None
+
+
+def queue_analysis(data: dict) -> bool:
+    """Enqueue an analysis row for the batch writer. False if it was not queued."""
+    if _analysis_queue is None:
+        return False
+    row = dict(data)
+    row.setdefault("created_at", datetime.now(timezone.utc))   # request time, not flush time
+    try:
+        _analysis_queue.put_nowait(row)
+        return True
+    except asyncio.QueueFull:
+        logger.error("Analysis write queue full — dropping row.")
+        return False
+
+
+def _insert_analyses(rows: list[dict]) -> None:
+    """
+    Insert a batch of rows; rows with the same columns share one executemany.
+    If the batch transaction fails, rows are retried one per transaction so a
+    single bad row only loses itself.
+    """
+    groups: dict[tuple, list[dict]] = {}
+    for row in rows:
+        groups.setdefault(tuple(sorted(row)), []).append(row)
+    insert = AnalysisResult.__table__.insert()
+    try:
+        with engine.begin() as conn:
+            for group in groups.values():
+                conn.execute(insert, group)
+        return
+    except Exception as e:
+        if len(rows) == 1:
+            raise
+        logger.warning(f"Batch insert of {len(rows)} analyses failed, retrying row by row: {e}")
+
+    for row in rows:
+        try:
+            with engine.begin() as conn:
+                conn.execute(insert, row)
+        except Exception as e:
+            logger.error(f"Failed to save analysis at ({row.get('lat')}, {row.get('lng')}): {e}")
+
+
+async def _flush_analyses(queue: asyncio.Queue) -> None:
+    """Writer loop; a None on the queue flushes what has been gathered and exits."""
+    loop = asyncio.get_running_loop()
+    stopping = False
+    while not stopping:
+        row = await queue.get()
+        if row is None:
+            break
+        rows = [row]
+        deadline = loop.time() + ANALYSIS_FLUSH_INTERVAL_S
+        while len(rows) < ANALYSIS_BATCH_SIZE:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                row = await asyncio.wait_for(queue.get(), timeout)
+            except asyncio.TimeoutError:
+                break
+            if row is None:
+                stopping = True
+                break
+            rows.append(row)
+        try:
+            await asyncio.to_thread(_insert_analyses, rows)
+        except Exception as e:
+            logger.error(f"Failed to save {len(rows)} analyses: {e}")
+
+
+def start_analysis_writer() -> None:
+    """Start the background writer (call from app startup, after init_db)."""
+    global _analysis_queue, _analysis_writer
+    if engine is None or _analysis_writer is not None:
+        return
+    _analysis_queue = asyncio.Queue(maxsize=ANALYSIS_QUEUE_MAX)
+    _analysis_writer = asyncio.create_task(_flush_analyses(_analysis_queue))
+
+
+async def stop_analysis_writer() -> None:
+    """Flush everything still queued and stop the writer (call on shutdown)."""
+    global _analysis_queue, _analysis_writer
+    if _analysis_writer is None:
+        return
+    queue, writer = _analysis_queue, _analysis_writer
+    _analysis_queue = None          # new rows are refused from here on
+    await queue.put(None)           # FIFO: everything queued before it is written
+    await writer
+    _analysis_writer = None
+
+
 def get_recent_analyses(db: Session, limit: int = 20) -> list[AnalysisResult]:
     """Fetch the most recent analyses ordered by creation time."""
     if db is None:
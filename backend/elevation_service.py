@@ -8,17 +8,36 @@ Slope estimation uses a 4-point cardinal gradient:
 """
 
 import os
-import httpx
+import asyncio
 import logging
 import math
+from collections import OrderedDict
+
+import orjson
+
+from http_client import get_client
 
 logger = logging.getLogger(__name__)
 
 GOOGLE_ELEVATION_URL  = "https://maps.googleapis.com/maps/api/elevation/json"
 OPEN_ELEVATION_URL    = "https://api.open-elevation.com/api/v1/lookup"
 
+# Open-Elevation waits this long before racing Google (saves quota when Google is healthy)
+OPEN_ELEVATION_HEADSTART_S = 0.2
+
 # 200m offset in degrees (≈ 0.0018° at equator)
 SLOPE_OFFSET_DEG = 0.0018
+# 1 / (2 × stencil spacing in metres) — rise/run denominator for N-S and E-W
+_INV_2_SPACING_M = 1.0 / (2 * SLOPE_OFFSET_DEG * 111_000)
+
+# Per-request timeout on the shared client (http_client.get_client)
+TIMEOUT = 12.0
+
+
+# Terrain is static — cache per ~110 m cell (lat/lng rounded to 3 dp)
+CACHE_DECIMALS  = 3
+CACHE_MAX_CELLS = 50_000
+_elev_cache: "OrderedDict[tuple[float, float], dict]" = OrderedDict()
 
 
 async def fetch_elevation_and_slope(lat: float, lng: float) -> dict:
@@ -27,8 +46,40 @@ async def fetch_elevation_and_slope(lat: float, lng: float) -> dict:
 
     Elevation: Google Maps API → Open-Elevation → region estimate.
     Slope: 5-point stencil (centre + 4 cardinal neighbours) → terrain gradient.
+    Live results are cached per rounded lat/lng cell; estimates are not.
     """
-    points = [
+    lat = round(lat, CACHE_DECIMALS)
+    lng = round(lng, CACHE_DECIMALS)
+    key = (lat, lng)
+    cached = _elev_cache.get(key)
+    if cached is not None:
+        _elev_cache.move_to_end(key)
+        return dict(cached)
+
+    elevations, live = await _batch_elevation(_stencil(lat, lng))
+    result = _elevation_and_slope(elevations)
+
+    logger.info(
+        f"Elevation: {result['elevation']:.1f}m  Slope: {result['slope_degrees']:.1f}° "
+        f"(lat={lat}, lng={lng})"
+    )
+
+    if live:
+        _elev_cache[key] = result
+        if len(_elev_cache) > CACHE_MAX_CELLS:
+            _elev_cache.popitem(last=False)
+    return dict(result)
+
+
+def _estimated_elevation_and_slope(lat: float, lng: float) -> dict:
+    """fetch_elevation_and_slope()'s result shape, from region estimates alone."""
+    lat = round(lat, CACHE_DECIMALS)
+    lng = round(lng, CACHE_DECIMALS)
+    return _elevation_and_slope(_estimate_elevations(_stencil(lat, lng)))
+
+
+def _stencil(lat: float, lng: float) -> list[tuple]:
+    return [
         (lat, lng),                          # centre
         (lat + SLOPE_OFFSET_DEG, lng),        # N
         (lat - SLOPE_OFFSET_DEG, lng),        # S
@@ -36,25 +87,16 @@ async def fetch_elevation_and_slope(lat: float, lng: float) -> dict:
         (lat, lng - SLOPE_OFFSET_DEG),        # W
     ]
 
-    elevations = await _batch_elevation(points)
+
+def _elevation_and_slope(elevations: list[float]) -> dict:
     centre_elev = elevations[0]
     n, s, e, w  = elevations[1], elevations[2], elevations[3], elevations[4]
 
     # 200m spacing → rise/run → degrees
-    spacing_m = SLOPE_OFFSET_DEG * 111_000   # metres per degree (approx)
-    dz_ns = abs(n - s) / (2 * spacing_m)
-    dz_ew = abs(e - w) / (2 * spacing_m)
-    gradient = math.sqrt(dz_ns**2 + dz_ew**2)
-    slope_deg = round(math.degrees(math.atan(gradient)), 2)
-
-    logger.info(
-        f"Elevation: {centre_elev:.1f}m  Slope: {slope_deg:.1f}° "
-        f"(lat={lat}, lng={lng})"
-    )
-
+    gradient = math.hypot(n - s, e - w) * _INV_2_SPACING_M
     return {
         "elevation":     round(centre_elev, 1),
-        "slope_degrees": slope_deg,
+        "slope_degrees": round(math.degrees(math.atan(gradient)), 2),
     }
 
 
@@ -66,46 +108,98 @@ async def fetch_elevation(lat: float, lng: float) -> float:
 
 # ── Internal batch elevation fetcher ─────────────────────────────────────────
 
-async def _batch_elevation(points: list[tuple]) -> list[float]:
-    """Fetch elevation for a list of (lat, lng) points."""
+async def _batch_elevation(points: list[tuple]) -> tuple[list[float], bool]:
+    """
+    Fetch elevation for a list of (lat, lng) points.
+    Returns (elevations, live) — live is False when region estimates were used.
+
+    Google and Open-Elevation are raced; the first successful answer wins and
+    the other request is cancelled. Open-Elevation starts after a short
+    head-start delay so a healthy Google answer is preferred.
+    """
     api_key = os.getenv("GOOGLE_ELEVATION_API_KEY", "").strip()
 
-    # ── 1. Google Maps (supports batch) ──────────────────────────────────
+    tasks = [asyncio.create_task(_try_open_elevation(points, OPEN_ELEVATION_HEADSTART_S if api_key else 0.0))]
     if api_key:
-        try:
-            locations = "|".join(f"{lat},{lng}" for lat, lng in points)
-            async with httpx.AsyncClient(timeout=12.0) as client:
-                resp = await client.get(
-                    GOOGLE_ELEVATION_URL,
-                    params={"locations": locations, "key": api_key},
-                )
-                resp.raise_for_status()
-                data = resp.json()
-                if data.get("status") == "OK":
-                    return [float(r["elevation"]) for r in data["results"]]
-        except Exception as e:
-            logger.warning(f"Google Elevation batch failed ({e}).")
-
-    # ── 2. Open-Elevation (batch POST) ───────────────────────────────────
+        tasks.append(asyncio.create_task(_try_google(points, api_key)))
+
     try:
-        payload = {"locations": [{"latitude": lat, "longitude": lng}
-                                  for lat, lng in points]}
-        async with httpx.AsyncClient(timeout=12.0) as client:
-            resp = await client.post(OPEN_ELEVATION_URL, json=payload)
-            resp.raise_for_status()
-            data = resp.json()
+        for next_done in asyncio.as_completed(tasks):
+            elevations = await next_done
+            if elevations is not None:
+                return elevations, True
+    finally:
+        for t in tasks:
+            t.cancel()
+
+    # ── Fallback — region estimates for all points ────────────────────────
+    logger.warning("All elevation providers failed, using region estimates.")
+    return _estimate_elevations(points), False
+
+
+async def _try_google(points: list[tuple], api_key: str) -> list[float] | None:
+    """Google Maps Elevation (supports batch). None on any failure."""
+    try:
+        locations = "|".join(f"{lat},{lng}" for lat, lng in points)
+        resp = await get_client().get(
+            GOOGLE_ELEVATION_URL,
+            params={"locations": locations, "key": api_key},
+            timeout=TIMEOUT,
+        )
+        resp.raise_for_status()
+        data = orjson.loads(resp.content)
+        if data.get("status") == "OK":
             return [float(r["elevation"]) for r in data["results"]]
+        logger.warning(f"Google Elevation batch returned status={data.get('status')}.")
     except Exception as e:
-        logger.warning(f"Open-Elevation batch failed ({e}), using region estimates.")
+        logger.warning(f"Google Elevation batch failed ({e}).")
+    return None
+
 
-    # ── 3. Fallback — region estimates for all points ─────────────────────
-    return [_estimate_elevation(lat, lng) for lat, lng in points]
+async def _try_open_elevation(points: list[tuple], delay_s: float = 0.0) -> list[float] | None:
+    """Open-Elevation batch POST. None on any failure."""
+    try:
+        if delay_s:
+            await asyncio.sleep(delay_s)
+        payload = {"locations": [{"latitude": lat, "longitude": lng}
+                                  for lat, lng in points]}
+        resp = await get_client().post(OPEN_ELEVATION_URL, json=payload, timeout=TIMEOUT)
+        resp.raise_for_status()
+        data = orjson.loads(resp.content)
+        return [float(r["elevation"]) for r in data["results"]]
+    except Exception as e:
+        logger.warning(f"Open-Elevation batch failed ({e}).")
+    return None
+
+
+# (lat_min, lat_max, lng_min, lng_max, elevation_m) — first match wins
+ELEVATION_REGIONS = (
+    (28,  40,  75,  105, 3500.0),   # Himalayas
+    (8,   37,  68,  97,  400.0),    # India
+    (-55, 10,  -80, -60, 1500.0),   # Andes
+    (30,  60, -125, -90, 700.0),    # N America
+    (44,  48,  6,   16,  1200.0),   # Alps
+)
+DEFAULT_ELEVATION = 150.0   # coastal / lowland default
+
+
+def _estimate_elevations(points: list[tuple]) -> list[float]:
+    """Region estimate for a whole stencil; skips the ladder when it fits one region."""
+    lats = [p[0] for p in points]
+    lngs = [p[1] for p in points]
+    lat0, lat1, lng0, lng1 = min(lats), max(lats), min(lngs), max(lngs)
+    for r_lat0, r_lat1, r_lng0, r_lng1, elev in ELEVATION_REGIONS:
+        if r_lat0 <= lat0 and lat1 <= r_lat1 and r_lng0 <= lng0 and lng1 <= r_lng1:
+            return [elev] * len(points)
+        if lat1 < r_lat0 or lat0 > r_lat1 or lng1 < r_lng0 or lng0 > r_lng1:
+            continue   # stencil entirely outside this region
+        # Stencil straddles a region edge — resolve point by point
+        return [_estimate_elevation(lat, lng) for lat, lng in points]
+    return [DEFAULT_ELEVATION] * len(points)
 
 
 def _estimate_elevation(lat: float, lng: float) -> float:
-    if 28 <= lat <= 40 and 75 <= lng <= 105:  return 3500.0  # Himalayas
-    if 8  <= lat <= 37 and 68 <= lng <= 97:   return 400.0   # India
-    if -55 <= lat <= 10 and -80 <= lng <= -60: return 1500.0  # Andes
-    if 30 <= lat <= 60 and -125 <= lng <= -90: return 700.0   # N America
-    if 44 <= lat <= 48 and 6 <= lng <= 16:    return 1200.0  # Alps
-    return 150.0   # coastal / lowland default
+    for lat0, lat1, lng0, lng1, elev in ELEVATION_REGIONS:
+        if lat0 <= lat <= lat1 and lng0 <= lng <= lng1:
+            return elev
+    return DEFAULT_ELEVATION
@@ -5,8 +5,10 @@ Uses actual solar irradiance patterns and location-aware calculations.
 """
 
 import math
+import time
 import random
-from datetime import datetime, timezone
+import hashlib
+from datetime import date, datetime, timezone
 
 # India grid CO2 emission factor (kg CO2e / kWh) — CEA 2024-25
 CO2_KG_PER_KWH_INDIA = 0.82
@@ -14,6 +16,15 @@ CO2_KG_PER_KWH_INDIA = 0.82
 # Average household consumption (kWh/day) — urban India
 HOUSEHOLD_KWH_DAY = 10.0
 
+_sha256 = hashlib.sha256   # OpenSSL-backed (SHA-NI / ARMv8 SHA2 where available)
+_rand   = random.random    # uniform(a, b) is just a + (b - a) * random()
+_WEATHER_SPAN = 1.1 - 0.7
+
+# Fixed English labels (strftime("%a"/"%b") would follow the process locale)
+_DAY_NAMES  = ("Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun")
+_MONTH_ABBR = ("Jan", "Feb", "Mar", "Apr", "May", "Jun",
+               "Jul", "Aug", "Sep", "Oct", "Nov", "Dec")
+
 
 # ── 24-hour solar irradiance curve (normalised, 0-1) ─────────────────────────
 # Follows a sunrise-to-sunset bell curve (approx. 6 AM to 7 PM in India)
@@ -25,6 +36,11 @@ def _solar_curve(hour: int, peak_hour: int = 13) -> float:
     return max(0.0, math.exp(-x * x))
 
 
+# Default 13:00 peak — precomputed once, the curve never changes
+_SOLAR_CURVE_13 = tuple(_solar_curve(h) for h in range(24))
+_HOUR_LABELS    = tuple(f"{h:02d}:00" for h in range(24))
+
+
 def generate_24h_energy(
     solar_irradiance: float,
     panel_area: float,
@@ -37,19 +53,17 @@ def generate_24h_energy(
     Returns list of 24 dicts: { hour, time_label, energy_kwh, power_kw }
     Includes small random noise (±5%) to look realistic.
     """
-    records = []
-    for h in range(24):
-        curve = _solar_curve(h)
-        noise = 1 + random.uniform(-0.05, 0.05) if curve > 0 else 0
-        power_kw = solar_irradiance * panel_area * efficiency * curve * noise
-        energy_kwh = power_kw  # per hour
-        records.append({
-            "hour": h,
-            "time": f"{h:02d}:00",
-            "power_kw": round(power_kw, 3),
-            "energy_kwh": round(energy_kwh, 3),
-        })
-    return records
+    gain = solar_irradiance * panel_area * efficiency
+    rand = _rand
+    power = [
+        round(gain * c * (1 + (-0.05 + 0.1 * rand())), 3) if c > 0 else 0.0   # ±5% noise
+        for c in _SOLAR_CURVE_13
+    ]
+    # energy_kwh == power_kw for a one-hour slot
+    return [
+        {"hour": h, "time": label, "power_kw": p, "energy_kwh": p}
+        for h, label, p in zip(range(24), _HOUR_LABELS, power)
+    ]
 
 
 def predict_7day_energy(
@@ -61,19 +75,18 @@ def predict_7day_energy(
     Predict daily energy output for the next 7 days.
     Uses solar irradiance with day-to-day weather variance (±10%).
     """
-    from datetime import timedelta
-    today = datetime.now(timezone.utc)
-    day_names = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
+    today_ord = datetime.now(timezone.utc).date().toordinal()
+    daily_base = solar_irradiance * panel_area * efficiency * 5.5   # 5.5 peak-sun-hours
     results = []
     for i in range(7):
-        day = today + timedelta(days=i)
+        day = date.fromordinal(today_ord + i)
         # Simulate cloud/weather variance
-        weather_factor = random.uniform(0.7, 1.1)
-        daily_kwh = solar_irradiance * panel_area * efficiency * 5.5 * weather_factor  # 5.5 peak-sun-hours
+        weather_factor = 0.7 + _WEATHER_SPAN * _rand()        # uniform 0.7–1.1
+        daily_kwh = daily_base * weather_factor
         weather_label = "Sunny" if weather_factor > 0.95 else ("Partly Cloudy" if weather_factor > 0.8 else "Cloudy")
         results.append({
-            "day": day_names[day.weekday()],
-            "date": day.strftime("%b %d"),
+            "day": _DAY_NAMES[day.weekday()],
+            "date": f"{_MONTH_ABBR[day.month - 1]} {day.day:02d}",
             "energy_kwh": round(daily_kwh, 1),
             "weather": weather_label,
             "weather_factor": round(weather_factor, 2),
@@ -160,30 +173,40 @@ def generate_p2p_market(surplus_kwh: float, electricity_rate: float = 8.0) -> li
     return result
 
 
+# Simulated trade history replayed by generate_blockchain_ledger
+_LEDGER_TRANSACTIONS = (
+    ("SOLAR_GEN", 12.4, "Grid Export"),
+    ("P2P_SELL",   3.5, "Ramesh Sharma"),
+    ("SOLAR_GEN", 11.8, "Grid Export"),
+    ("P2P_SELL",   5.0, "Priya Mehta"),
+    ("NET_METER",  8.9, "DISCOM Credit"),
+    ("P2P_SELL",   2.0, "Vikram Das"),
+)
+
+
+def _fmt_utc(ts: int) -> str:
+    """Format as 'YYYY-MM-DD HH:MM UTC' via time.gmtime (no datetime/strftime per row)."""
+    tm = time.gmtime(ts)
+    return f"{tm.tm_year:04d}-{tm.tm_mon:02d}-{tm.tm_mday:02d} {tm.tm_hour:02d}:{tm.tm_min:02d} UTC"
+
+
 def generate_blockchain_ledger(entries: int = 6) -> list[dict]:
     """
     Simulate recent blockchain transaction records for energy trades.
     Returns realistic-looking immutable ledger entries.
     """
-    import hashlib, time
     records = []
     prev_hash = "0" * 64
-    base_ts = int(time.time()) - entries * 3600
-    transactions = [
-        ("SOLAR_GEN", 12.4, "Grid Export"),
-        ("P2P_SELL",   3.5, "Ramesh Sharma"),
-        ("SOLAR_GEN", 11.8, "Grid Export"),
-        ("P2P_SELL",   5.0, "Priya Mehta"),
-        ("NET_METER",  8.9, "DISCOM Credit"),
-        ("P2P_SELL",   2.0, "Vikram Das"),
-    ]
-    for i, (tx_type, kwh, party) in enumerate(transactions[:entries]):
-        ts = base_ts + i * 3600
-        data = f"{tx_type}{kwh}{party}{ts}{prev_hash}"
-        block_hash = hashlib.sha256(data.encode()).hexdigest()
+    prev_hash_bytes = prev_hash.encode()
+    ts = int(time.time()) - entries * 3600
+    for i, (tx_type, kwh, party) in enumerate(_LEDGER_TRANSACTIONS[:entries]):
+        # Digest of f"{tx_type}{kwh}{party}{ts}{prev_hash}", fed incrementally
+        h = _sha256(f"{tx_type}{kwh}{party}{ts}".encode())
+        h.update(prev_hash_bytes)
+        block_hash = h.hexdigest()
         records.append({
             "block":     i + 1,
-            "timestamp": datetime.fromtimestamp(ts, tz=timezone.utc).strftime("%Y-%m-%d %H:%M UTC"),
+            "timestamp": _fmt_utc(ts),
             "type":      tx_type,
             "kwh":       kwh,
             "party":     party,
@@ -192,4 +215,6 @@ def generate_blockchain_ledger(entries: int = 6) -> list[dict]:
             "status":    "Confirmed",
         })
         prev_hash = block_hash
+        prev_hash_bytes = block_hash.encode()
+        ts += 3600
     return records
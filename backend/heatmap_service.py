@@ -16,32 +16,65 @@ Key design decisions:
 import math
 import asyncio
 import logging
-from typing import List, Tuple, Dict, Optional
+from bisect import bisect_left, bisect_right
+from collections import Counter
+from functools import lru_cache
+from typing import List, Tuple, Dict, NamedTuple, Optional
 
-from scoring import calculate_score
+from scoring import raw_score_batch, calibrate_scores, get_grade, get_suitability_class
 
 logger = logging.getLogger(__name__)
 
 # ── Constants ────────────────────────────────────────────────────────────────
-EARTH_RADIUS = 6371000          # metres
+EARTH_RADIUS_M = 6_371_000.0    # metres
 DEFAULT_CELL_METRES = 100       # 100 m × 100 m grid cells
 MIN_CELLS = 4
 MAX_CELLS = 200                 # cap for performance
+OFFLOAD_MIN_CELLS = 32          # raw-score in a worker thread from this many cells up
+GRID_CACHE_SIZE = 256           # memoised polygon lattices
+SUITABILITY_CLASSES = ("Excellent", "Good", "Moderate", "Poor", "Unsuitable")
+
+_M_PER_DEG_LAT = EARTH_RADIUS_M * math.pi / 180   # metres per degree of latitude
 
 # ── Geometry helpers ─────────────────────────────────────────────────────────
 
 def _latlon_to_m(lat: float) -> Tuple[float, float]:
     """Return metres-per-degree for (lat, lng) at given latitude."""
-    m_per_lat = EARTH_RADIUS * math.pi / 180
-    m_per_lng = EARTH_RADIUS * math.cos(math.radians(lat)) * math.pi / 180
-    return m_per_lat, m_per_lng
+    return _M_PER_DEG_LAT, _M_PER_DEG_LAT * math.cos(math.radians(lat))
+
+
+def _split_vertices(
+    vertices: List[Tuple[float, float]],
+) -> Tuple[Tuple[float, ...], Tuple[float, ...]]:
+    """
+    Unpack [[lat, lng], ...] once into parallel (lats, lngs) tuples so the
+    geometry helpers index flat float sequences instead of nested pairs.
+    """
+    lats = tuple(float(v[0]) for v in vertices)
+    lngs = tuple(float(v[1]) for v in vertices)
+    return lats, lngs
 
 
-def _bbox(vertices: List[Tuple[float, float]]) -> Tuple[float, float, float, float]:
-    """Return (min_lat, min_lng, max_lat, max_lng) bounding box."""
-    lats = [v[0] for v in vertices]
-    lngs = [v[1] for v in vertices]
-    return min(lats), min(lngs), max(lats), max(lngs)
+class PolygonStats(NamedTuple):
+    min_lat: float
+    min_lng: float
+    max_lat: float
+    max_lng: float
+    mean_lat: float     # vertex-mean centroid (single-cell fallback)
+    mean_lng: float
+
+
+def _polygon_stats(lats: Tuple[float, ...],
+                   lngs: Tuple[float, ...]) -> PolygonStats:
+    """
+    Bounding box and vertex-mean centroid.  One C-level min/max/sum pass per
+    coordinate, which beats a single Python loop over the vertices.
+    """
+    n = len(lats)
+    return PolygonStats(
+        min(lats), min(lngs), max(lats), max(lngs),
+        sum(lats) / n, sum(lngs) / n,
+    )
 
 
 def _point_in_polygon(lat: float, lng: float,
@@ -59,6 +92,51 @@ def _point_in_polygon(lat: float, lng: float,
     return inside
 
 
+def _polygon_edges(
+    lats: Tuple[float, ...],
+    lngs: Tuple[float, ...],
+) -> List[Tuple[float, float, float, float, int]]:
+    """
+    Per-edge constants (lat_i, lat_j, lng_i, dlng/dlat, direction), computed
+    once per polygon. direction is +1 for edges running north, -1 for south.
+    Horizontal edges never cross a grid row and are dropped, which also
+    removes the divide-by-zero guard from the crossing formula.
+    """
+    edges = []
+    n = len(lats)
+    j = n - 1
+    for i in range(n):
+        yi, xi = lats[i], lngs[i]
+        yj, xj = lats[j], lngs[j]
+        if yi != yj:
+            edges.append((yi, yj, xi, (xj - xi) / (yj - yi), 1 if yi > yj else -1))
+        j = i
+    return edges
+
+
+def _row_crossings(
+    lat: float,
+    edges: List[Tuple[float, float, float, float, int]],
+) -> Tuple[List[float], List[int]]:
+    """
+    Edge crossings of the horizontal line at `lat`, computed once per grid row.
+
+    Returns (xs, winding): xs are the crossing lngs in ascending order and
+    winding[k] is the winding number of any point with xs[k-1] <= lng < xs[k]
+    (the signed count of crossings east of it); winding[len(xs)] == 0.
+    """
+    crossings = sorted(
+        (xi + slope * (lat - yi), direction)
+        for yi, yj, xi, slope, direction in edges
+        if (yi > lat) != (yj > lat)
+    )
+    xs = [x for x, _ in crossings]
+    winding = [0] * (len(crossings) + 1)
+    for k in range(len(crossings) - 1, -1, -1):
+        winding[k] = winding[k + 1] + crossings[k][1]
+    return xs, winding
+
+
 def generate_grid_centroids(
     vertices: List[Tuple[float, float]],
     cell_metres: int = DEFAULT_CELL_METRES,
@@ -70,7 +148,23 @@ def generate_grid_centroids(
     if len(vertices) < 3:
         return []
 
-    min_lat, min_lng, max_lat, max_lng = _bbox(vertices)
+    lats, lngs = _split_vertices(vertices)
+    return list(_grid_centroids(lats, lngs, cell_metres))
+
+
+@lru_cache(maxsize=GRID_CACHE_SIZE)
+def _grid_centroids(
+    lats: Tuple[float, ...],
+    lngs: Tuple[float, ...],
+    cell_metres: int,
+) -> Tuple[Tuple[float, float], ...]:
+    """
+    Lattice for one polygon outline, memoised: the same field is typically
+    re-analysed several times (tweaked plant size, tariffs, re-opens), and
+    the geometry only depends on the vertices and cell size.
+    """
+    stats = _polygon_stats(lats, lngs)
+    min_lat, min_lng, max_lat, max_lng = stats[:4]
     centre_lat = (min_lat + max_lat) / 2
 
     m_per_lat, m_per_lng = _latlon_to_m(centre_lat)
@@ -85,27 +179,46 @@ def generate_grid_centroids(
         dlat *= scale
         dlng *= scale
 
+    # Scanline winding-number test: a cell is inside when the signed count of
+    # the row's edge crossings east of it is non-zero. Matches the even-odd
+    # _point_in_polygon for simple polygons; self-intersecting outlines are
+    # filled by the non-zero rule. _point_in_polygon is kept as the scalar
+    # reference test.
+    # Lattice points are min + (k + ½)·step, indexed rather than accumulated
+    # so large polygons don't drift off-grid.
+    n_rows = int((max_lat - min_lat) / dlat + 0.5)
+    n_cols = int((max_lng - min_lng) / dlng + 0.5)
+    col_lngs = [min_lng + (j + 0.5) * dlng for j in range(n_cols)]
+    edges = _polygon_edges(lats, lngs)
+
     centroids = []
-    lat = min_lat + dlat / 2
-    while lat <= max_lat:
-        lng = min_lng + dlng / 2
-        while lng <= max_lng:
-            if _point_in_polygon(lat, lng, vertices):
-                centroids.append((round(lat, 7), round(lng, 7)))
-            lng += dlng
-        lat += dlat
+    for i in range(n_rows):
+        lat = min_lat + (i + 0.5) * dlat
+        xs, winding = _row_crossings(lat, edges)
+        # Each span [xs[k-1], xs[k]) is wholly inside or outside, so whole
+        # column ranges are accepted or rejected by interval arithmetic —
+        # no per-cell test. Net winding is 0 west of xs[0] and east of xs[-1].
+        lat_r = round(lat, 7)
+        for k in range(1, len(xs)):
+            if winding[k]:
+                lo = bisect_left(col_lngs, xs[k - 1])
+                hi = bisect_left(col_lngs, xs[k], lo)
+                centroids.extend((lat_r, round(lng, 7)) for lng in col_lngs[lo:hi])
 
     if not centroids:
         # Fallback: use polygon centroid as single cell
-        c_lat = sum(v[0] for v in vertices) / len(vertices)
-        c_lng = sum(v[1] for v in vertices) / len(vertices)
-        centroids = [(round(c_lat, 7), round(c_lng, 7))]
+        centroids = [(round(stats.mean_lat, 7), round(stats.mean_lng, 7))]
 
-    return centroids[:MAX_CELLS]
+    return tuple(centroids[:MAX_CELLS])
 
 
 # ── Local terrain estimator (no API calls) ───────────────────────────────────
 
+# Slope 0.5–2.5° with slight spatial variation (very flat in most polygons),
+# indexed by a 0–99 position seed.
+_SLOPE_BY_SEED = tuple(round(0.5 + (seed / 100) * 2.0, 2) for seed in range(100))
+
+
 def _estimate_elev_slopes_local(
     centroids: List[Tuple[float, float]],
     base_elevation: float = 200.0,
@@ -119,29 +232,65 @@ def _estimate_elev_slopes_local(
     - Slope: light pseudo-variation based on cell position (0–3°)
       Real slope differences within a 1–5 km polygon are minimal.
     """
-    results = []
-    for i, (lat, lng) in enumerate(centroids):
-        # Tiny elevation variation per cell (±20m) based on position parity
-        elev_offset = ((i * 7 + int(lat * 1000)) % 41) - 20
-        elevation = max(10.0, base_elevation + elev_offset)
+    # Tiny elevation variation per cell (±20m) based on position parity —
+    # only 41 distinct offsets, so build the rounded values once per call.
+    elev_by_offset = tuple(
+        round(max(10.0, base_elevation + (off - 20)), 1) for off in range(41)
+    )
+    return [
+        (
+            elev_by_offset[(i * 7 + int(lat * 1000)) % 41],
+            _SLOPE_BY_SEED[(int(lat * 10000) + int(lng * 10000)) % 100],
+        )
+        for i, (lat, lng) in enumerate(centroids)
+    ]
 
-        # Slope 0.5–2.5° with slight spatial variation (very flat in most polygons)
-        slope_seed = (int(lat * 10000) + int(lng * 10000)) % 100
-        slope_deg = round(0.5 + (slope_seed / 100) * 2.0, 2)   # 0.5–2.5°
 
-        results.append((round(elevation, 1), slope_deg))
-    return results
+# ── Score colour ─────────────────────────────────────────────────────────────
 
+_COLOR_THRESHOLDS = (35, 50, 65, 80)
+_COLORS = (
+    "#ef4444",   # red — Unsuitable
+    "#f97316",   # orange — Poor
+    "#f59e0b",   # amber — Moderate
+    "#3b82f6",   # blue — Good
+    "#10b981",   # green — Excellent
+)
 
-# ── Score colour ─────────────────────────────────────────────────────────────
 
 def _score_to_color(score: int) -> str:
     """Map score 0-100 to a hex colour for heatmap rendering."""
-    if score >= 80: return "#10b981"   # green — Excellent
-    if score >= 65: return "#3b82f6"   # blue — Good
-    if score >= 50: return "#f59e0b"   # amber — Moderate
-    if score >= 35: return "#f97316"   # orange — Poor
-    return "#ef4444"                   # red — Unsuitable
+    return _COLORS[bisect_right(_COLOR_THRESHOLDS, score)]
+
+
+# Scores are integers 0-100: (grade, colour, suitability class) per score,
+# looked up per cell instead of three threshold ladders per cell.  Public —
+# nationwide_heatmap labels its cells from the same table.
+SCORE_LABELS = tuple(
+    (get_grade(s), _score_to_color(s), get_suitability_class(s)) for s in range(101)
+)
+
+
+# ── Per-cell scoring ──────────────────────────────────────────────────────────
+
+def _build_cells(
+    centroids: List[Tuple[float, float]],
+    elev_slopes: List[Tuple[float, float]],
+    scores: List[int],
+) -> List[Dict]:
+    """Cell dicts for the scored grid; labels come from the per-score table."""
+    return [
+        {
+            "lat": lat, "lng": lng,
+            "score": score,
+            "grade": SCORE_LABELS[score][0],
+            "color": SCORE_LABELS[score][1],
+            "elevation": round(elevation, 1),
+            "slope_degrees": round(slope_deg, 2),
+            "suitability_class": SCORE_LABELS[score][2],
+        }
+        for (lat, lng), (elevation, slope_deg), score in zip(centroids, elev_slopes, scores)
+    ]
 
 
 # ── Main heatmap function ─────────────────────────────────────────────────────
@@ -169,44 +318,48 @@ async def compute_heatmap(
     # Instant local elevation/slope estimate — no API calls, no rate-limiting
     elev_slopes = _estimate_elev_slopes_local(centroids, base_elevation)
 
-    # Score each cell
-    cells = []
-    for (lat, lng), (elevation, slope_deg) in zip(centroids, elev_slopes):
-        result = calculate_score(
-            solar_irradiance=solar_irradiance,
-            wind_speed=wind_speed,
-            elevation=elevation,
-            temperature=temperature,
-            humidity=humidity,
-            lat=lat,
-            cloud_cover_pct=cloud_cover_pct,
-            slope_degrees=slope_deg,
-            grid_distance_km=grid_distance_km,
-            plant_size_kw=plant_size_kw,
-            available_area_m2=available_area_m2,
-            data_sources=4,
-            apply_calibration=True,
-            run_constraints=False,    # don't fail cells individually
-        )
-        cells.append({
-            "lat": lat, "lng": lng,
-            "score": result["score"],
-            "grade": result["grade"],
-            "color": _score_to_color(result["score"]),
-            "elevation": round(elevation, 1),
-            "slope_degrees": round(slope_deg, 2),
-            "suitability_class": result["suitability_class"],
-        })
+    # Score every cell with the 8-factor engine in one batch — site-wide
+    # factors are evaluated once, only slope/elevation vary per cell.  The raw
+    # scoring is pure and CPU-bound, so larger grids run it off the event loop;
+    # calibration mutates the shared calibrator and stays on the loop.
+    # (humidity only feeds the per-site confidence score, which cells don't report)
+    terrain_cells = [(lat, elevation, slope_deg)
+                     for (lat, _), (elevation, slope_deg) in zip(centroids, elev_slopes)]
+    score_kwargs = dict(
+        solar_irradiance=solar_irradiance,
+        wind_speed=wind_speed,
+        temperature=temperature,
+        cloud_cover_pct=cloud_cover_pct,
+        grid_distance_km=grid_distance_km,
+        plant_size_kw=plant_size_kw,
+        available_area_m2=available_area_m2,
+    )
+    if len(centroids) >= OFFLOAD_MIN_CELLS:
+        raw_scores = await asyncio.to_thread(raw_score_batch, terrain_cells, **score_kwargs)
+    else:
+        raw_scores = raw_score_batch(terrain_cells, **score_kwargs)
+    cells = _build_cells(
+        centroids, elev_slopes,
+        calibrate_scores([lat for lat, _ in centroids], raw_scores),
+    )
 
     if not cells:
         return {"cells": [], "cell_count": 0}
 
-    # Sort by score descending
-    cells.sort(key=lambda c: c["score"], reverse=True)
+    # Sort by score descending — order indices on the flat score list (stable,
+    # so ties keep grid order) instead of calling a lambda per dict
     scores = [c["score"] for c in cells]
-
-    mean_score  = sum(scores) / len(scores)
-    variance    = sum((s - mean_score) ** 2 for s in scores) / len(scores)
+    order = sorted(range(len(scores)), key=scores.__getitem__, reverse=True)
+    cells = [cells[i] for i in order]
+    scores = [scores[i] for i in order]
+
+    # Scores are ints, so one pass of exact integer sums gives mean and
+    # population variance without a second traversal or float cancellation
+    n           = len(scores)
+    total       = sum(scores)
+    total_sq    = sum(s * s for s in scores)
+    mean_score  = total / n
+    variance    = (n * total_sq - total * total) / (n * n)
     std_dev     = math.sqrt(variance)
 
     # Grid-variance confidence calibration:
@@ -217,10 +370,8 @@ async def compute_heatmap(
     confidence_calibrated = round(50 + 50 * agreement_factor, 1)
 
     # Suitability distribution
-    dist = {"Excellent": 0, "Good": 0, "Moderate": 0, "Poor": 0, "Unsuitable": 0}
-    for c in cells:
-        key = c["suitability_class"]
-        dist[key] = dist.get(key, 0) + 1
+    dist = dict.fromkeys(SUITABILITY_CLASSES, 0)
+    dist.update(Counter(c["suitability_class"] for c in cells))
 
     optimal = cells[0]
     top_cells = cells[:3]
@@ -0,0 +1,32 @@
+"""
+HelioScope AI — Shared Outbound HTTP Client
+One long-lived httpx.AsyncClient for every external data source (NASA POWER,
+Open-Meteo, Google / Open-Elevation), so DNS lookups, TCP connections and TLS
+sessions are reused across requests instead of renegotiated per call.
+Services pass their own per-request timeout.
+"""
+
+import httpx
+
+DEFAULT_TIMEOUT = 20.0
+
+_client: httpx.AsyncClient | None = None
+
+
+def get_client() -> httpx.AsyncClient:
+    """Return the shared client, creating it on first use."""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            timeout=DEFAULT_TIMEOUT,
+            limits=httpx.Limits(max_keepalive_connections=50, max_connections=100),
+        )
+    return _client
+
+
+async def close_client() -> None:
+    """Close the shared client (called from the app lifespan on shutdown)."""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
@@ -4,11 +4,21 @@ Generates intelligent placement recommendations using Google Gemini.
 """
 
 import os
+import asyncio
 import logging
+from functools import lru_cache
 from typing import Optional
 
 logger = logging.getLogger(__name__)
 
+# Prompt/template text is a pure function of the analysis numbers; repeat
+# requests for the same site (and template fallbacks) reuse the string.
+TEXT_CACHE_SIZE = 1024
+
+# Each Gemini model gets this long before the next one in preference order is
+# started alongside it; a failure starts the next one straight away.
+MODEL_HEADSTART_S = 2.0
+
 
 async def generate_summary(
     score: int,
@@ -48,21 +58,52 @@ async def generate_summary(
         ]
 
         prompt = _build_prompt(score, roi_years, lat, lng, solar_irradiance, wind_speed, elevation, annual_savings)
-        last_err = None
 
-        for model_name in model_names:
-            try:
-                model = genai.GenerativeModel(model_name)
-                response = model.generate_content(prompt)
-                logger.info(f"Gemini response via {model_name}")
-                return {
-                    "summary": response.text.strip(),
-                    "generated_by": model_name,
-                }
-            except Exception as e:
-                last_err = e
-                logger.warning(f"Gemini model {model_name} failed: {e}")
-                continue
+        # The SDK is blocking, so each model runs in a worker thread.  Models
+        # are hedged in preference order: the next one starts as soon as an
+        # in-flight call fails or the newest has had MODEL_HEADSTART_S.  The
+        # first success wins, with ties going to the preferred model; the rest
+        # are abandoned.
+        tasks = {}
+        pending = set()
+        last_err = None
+        remaining = iter(model_names)
+
+        def start_next() -> None:
+            name = next(remaining, None)
+            if name is not None:
+                task = asyncio.create_task(asyncio.to_thread(_generate_text, genai, name, prompt))
+                tasks[task] = name
+                pending.add(task)
+
+        start_next()
+        try:
+            while pending:
+                done, _ = await asyncio.wait(
+                    pending,
+                    timeout=MODEL_HEADSTART_S if len(tasks) < len(model_names) else None,
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                pending.difference_update(done)
+                winner = None
+                for task in sorted(done, key=lambda t: model_names.index(tasks[t])):
+                    model_name = tasks[task]
+                    err = task.exception()
+                    if err is not None:
+                        last_err = err
+                        logger.warning(f"Gemini model {model_name} failed: {err}")
+                    elif winner is None:
+                        winner = task
+                if winner is not None:
+                    logger.info(f"Gemini response via {tasks[winner]}")
+                    return {
+                        "summary": winner.result(),
+                        "generated_by": tasks[winner],
+                    }
+                start_next()    # head start used up, or a model failed
+        finally:
+            for task in pending:
+                task.cancel()
 
         raise last_err
 
@@ -74,6 +115,13 @@ async def generate_summary(
         }
 
 
+def _generate_text(genai, model_name: str, prompt: str) -> str:
+    """Blocking single-model Gemini call (run via asyncio.to_thread)."""
+    model = genai.GenerativeModel(model_name)
+    return model.generate_content(prompt).text.strip()
+
+
+@lru_cache(maxsize=TEXT_CACHE_SIZE)
 def _build_prompt(
     score: int,
     roi_years: float,
@@ -114,6 +162,7 @@ Address:
 Keep it concise, insightful, and data-driven."""
 
 
+@lru_cache(maxsize=TEXT_CACHE_SIZE)
 def _template_summary(
     score: int,
     roi_years: float,
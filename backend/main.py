@@ -4,17 +4,24 @@ Renewable Energy Placement Intelligence Platform
 """
 
 import os
+import hmac
 import asyncio
+import hashlib
 import logging
 from contextlib import asynccontextmanager
+from functools import lru_cache
 
+import orjson
 from dotenv import load_dotenv
 from fastapi import FastAPI, Request, HTTPException, Depends
+from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import JSONResponse, ORJSONResponse, Response, StreamingResponse
 from slowapi import Limiter, _rate_limit_exceeded_handler
 from slowapi.util import get_remote_address
 from slowapi.errors import RateLimitExceeded
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 
 from models import (
@@ -28,27 +35,27 @@ from models import (
     AnalyzeRequest,
     AnalyzeResponse,
 )
-from scoring import calculate_score
 from roi import calculate_roi
-from solar_service import fetch_solar_irradiance
-from wind_service import fetch_weather, fetch_wind_speed
-from elevation_service import fetch_elevation_and_slope, fetch_elevation
+from solar_service import fetch_solar_irradiance, _estimate_solar_irradiance
+from wind_service import fetch_weather, fetch_wind_speed, _estimated_weather
+from elevation_service import fetch_elevation_and_slope, fetch_elevation, _estimated_elevation_and_slope
+import http_client
 from llm_service import generate_summary
-from database import init_db, get_db, save_analysis
+from database import init_db, get_db, queue_analysis, start_analysis_writer, stop_analysis_writer
 from scoring import calculate_score, get_calibrator
 from auth import (
     create_access_token, create_user, authenticate_user,
     get_current_user, require_auth, require_pro, require_enterprise,
     check_free_quota, increment_usage, get_usage_this_month,
-    FREE_QUOTA,
+    invalidate_user, CachedUser, FREE_QUOTA,
 )
 from user_db import User, BillingRecord, SubscriptionTier
 import energy_dashboard as ed
 from heatmap_service import compute_heatmap
 from seasonal_service import fetch_monthly_irradiance
-from nationwide_heatmap import compute_nationwide_heatmap
+from nationwide_heatmap import nationwide_heatmap_json
 from roi import calculate_tariff_sensitivity
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, EmailStr, ValidationError
 from typing import Optional, List, Tuple
 
 load_dotenv()
@@ -64,6 +71,7 @@ limiter = Limiter(key_func=get_remote_address)
 async def lifespan(app: FastAPI):
     logger.info("\u2705 HelioScope AI Backend starting up...")
     init_db()   # Connect to PostgreSQL and create tables
+    start_analysis_writer()   # batched background INSERTs for analysis results
     # Bootstrap adaptive calibrator from historical DB analyses
     try:
         from database import SessionLocal
@@ -73,6 +81,8 @@ async def lifespan(app: FastAPI):
         logger.warning(f"Calibrator bootstrap skipped: {_e}")
     yield
     logger.info("\ud83d\uded1 HelioScope AI Backend shutting down...")
+    await stop_analysis_writer()
+    await http_client.close_client()
 
 
 # ── App ───────────────────────────────────────────────────────────────────────
@@ -81,6 +91,8 @@ app = FastAPI(
     description="Renewable Energy Placement Intelligence Platform",
     version="1.0.0",
     lifespan=lifespan,
+    # orjson for every dict / model an endpoint returns without its own class
+    default_response_class=ORJSONResponse,
 )
 
 app.state.limiter = limiter
@@ -100,6 +112,11 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# ── Compression ───────────────────────────────────────────────────────────────
+# Heatmap / seasonal / analysis JSON is highly compressible numeric text;
+# small responses skip the gzip overhead.
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=6)
+
 # ── Grid Distance Estimator (used in /api/analyze pipeline) ───────────────────
 def _estimate_grid_km(lat: float, lng: float) -> float:
     """Heuristic grid proximity estimate when user doesn't provide grid_distance_km."""
@@ -113,11 +130,100 @@ def _estimate_grid_km(lat: float, lng: float) -> float:
     return 15.0  # Global default
 
 
+# ── Single-flight site fetch ──────────────────────────────────────────────────
+# Concurrent /api/analyze calls for the same spot (demo crowds, embedded
+# widgets) share one NASA + Open-Meteo + elevation round-trip instead of each
+# firing their own.  Keyed to 4 dp (~11 m); entries live only while in flight.
+INFLIGHT_DECIMALS = 4
+_inflight_sites: dict = {}
+
+# Per-source latency budget — a provider slower than this is replaced by the
+# same estimate the service itself falls back to, so one stalled API can't
+# hold the whole analysis for its own 12-35 s timeout chain.
+SOURCE_TIMEOUT_S = float(os.getenv("ANALYZE_SOURCE_TIMEOUT_S", "4.0"))
+
+
+async def _within_budget(coro, fallback, source: str):
+    """Await coro for at most SOURCE_TIMEOUT_S, else return fallback()."""
+    try:
+        async with asyncio.timeout(SOURCE_TIMEOUT_S):
+            return await coro
+    except TimeoutError:
+        logger.warning(f"[PIPELINEv3] {source} exceeded {SOURCE_TIMEOUT_S}s, using estimate.")
+        return fallback()
+
+
+async def _fetch_site_inputs(lat: float, lng: float) -> tuple:
+    """(solar, weather, elev_data) for a site — the triple external fetch."""
+    async with asyncio.TaskGroup() as tg:
+        solar = tg.create_task(_within_budget(
+            fetch_solar_irradiance(lat, lng),
+            lambda: _estimate_solar_irradiance(lat), "NASA POWER"))
+        weather = tg.create_task(_within_budget(
+            fetch_weather(lat, lng),
+            lambda: _estimated_weather(lat), "Open-Meteo"))
+        elev_data = tg.create_task(_within_budget(
+            fetch_elevation_and_slope(lat, lng),
+            lambda: _estimated_elevation_and_slope(lat, lng), "Elevation"))
+    return solar.result(), weather.result(), elev_data.result()
+
+
+async def _site_inputs(lat: float, lng: float) -> tuple:
+    """Join an in-flight fetch for this site, or start one."""
+    key = (round(lat, INFLIGHT_DECIMALS), round(lng, INFLIGHT_DECIMALS))
+    task = _inflight_sites.get(key)
+    if task is None:
+        task = asyncio.create_task(_fetch_site_inputs(lat, lng))
+        _inflight_sites[key] = task
+        task.add_done_callback(lambda _t: _inflight_sites.pop(key, None))
+    else:
+        logger.info(f"[PIPELINEv3] Joining in-flight fetch for {key}")
+    # Shielded: one client disconnecting must not cancel the others' fetch
+    return await asyncio.shield(task)
+
+
+# ── Request body helpers ──────────────────────────────────────────────────────
+async def _parse_body(request: Request, model: type[BaseModel]) -> BaseModel:
+    """
+    Parse + validate a JSON body in one pydantic-core (jiter) pass, instead of
+    FastAPI's json.loads → dict → validate.  Worth it for large bodies such as
+    heatmap polygons; errors surface as the usual 422 with body-prefixed locs.
+    """
+    try:
+        return model.model_validate_json(await request.body())
+    except ValidationError as e:
+        raise RequestValidationError(
+            [{**err, "loc": ("body", *err["loc"])} for err in e.errors(include_url=False)]
+        )
+
+
+def _body_schema(model: type[BaseModel]) -> dict:
+    """openapi_extra for routes that read their body via _parse_body."""
+    return {"requestBody": {
+        "required": True,
+        "content": {"application/json": {"schema": model.model_json_schema()}},
+    }}
+
+
+# ── Response helpers ──────────────────────────────────────────────────────────
+# Returning a Response skips FastAPI's response_model pass, so the routes that
+# encode plain dicts are unchecked by default.  Set VALIDATE_RESPONSES=1 (dev /
+# CI) to validate each payload against its model before it is sent.
+VALIDATE_RESPONSES = os.getenv("VALIDATE_RESPONSES", "") == "1"
+
+
+def _dict_response(model: type[BaseModel], payload: dict) -> ORJSONResponse:
+    """orjson-encode a payload built by our own code; validated only under VALIDATE_RESPONSES."""
+    if VALIDATE_RESPONSES:
+        model.model_validate(payload)
+    return ORJSONResponse(payload)
+
+
 # ── Health Check ──────────────────────────────────────────────────────────────
 @app.get("/api/health", response_model=HealthResponse, tags=["System"])
 async def health_check():
     """Health check endpoint for load balancer / Kubernetes probes."""
-    return HealthResponse(
+    return HealthResponse.model_construct(
         status="healthy",
         version="2.0.0",
         services={
@@ -139,7 +245,7 @@ async def health_check():
 # =========================================================================
 @app.post("/api/analyze", response_model=AnalyzeResponse, tags=["Pipeline"])
 @limiter.limit("20/minute")
-async def analyze_full_pipeline(request: Request, body: AnalyzeRequest, db: Session = Depends(get_db)):
+async def analyze_full_pipeline(request: Request, body: AnalyzeRequest):
     """
     UNIFIED PIPELINE v3 — 8-factor Gaussian-sigmoid production engine.
 
@@ -158,11 +264,7 @@ async def analyze_full_pipeline(request: Request, body: AnalyzeRequest, db: Sess
 
     # ── STEP 2: Concurrent fetch (solar + weather + elevation/slope) ──────
     logger.info("[PIPELINEv3] Step 2: Fetching NASA solar + Open-Meteo weather + elevation/slope concurrently...")
-    solar, weather, elev_data = await asyncio.gather(
-        fetch_solar_irradiance(body.lat, body.lng),
-        fetch_weather(body.lat, body.lng),
-        fetch_elevation_and_slope(body.lat, body.lng),
-    )
+    solar, weather, elev_data = await _site_inputs(body.lat, body.lng)
     wind        = weather["wind_speed"]
     temp_c      = weather["temperature_c"]
     humidity    = weather["humidity_pct"]
@@ -234,8 +336,8 @@ async def analyze_full_pipeline(request: Request, body: AnalyzeRequest, db: Sess
         annual_savings=roi_result["annual_savings_inr"],
     )
 
-    # ── Persist to DB ──────────────────────────────────────────────────────
-    save_analysis(db, {
+    # ── Persist to DB (queued; the batch writer inserts it) ────────────────
+    queue_analysis({
         "lat": body.lat, "lng": body.lng,
         "panel_area": roi_result["required_land_area_m2"],
         "efficiency": body.efficiency,
@@ -255,7 +357,11 @@ async def analyze_full_pipeline(request: Request, body: AnalyzeRequest, db: Sess
 
     # ── STEP 6: Return full v3 response ────────────────────────────────────
     logger.info("[PIPELINEv3] Step 6: Returning full v3 response to React.")
-    return AnalyzeResponse(
+    # Plain dict → orjson: every value was produced by our own scoring / ROI
+    # code, so re-validating ~50 fields through AnalyzeResponse on every request
+    # only costs CPU.  The model stays on the route as the OpenAPI schema and is
+    # enforced only under VALIDATE_RESPONSES.
+    return _dict_response(AnalyzeResponse, dict(
         # Location
         lat=body.lat, lng=body.lng,
         # Climate
@@ -301,7 +407,7 @@ async def analyze_full_pipeline(request: Request, body: AnalyzeRequest, db: Sess
         # AI
         ai_summary=summary_result["summary"],
         ai_generated_by=summary_result["generated_by"],
-    )
+    ))
 
 
 
@@ -309,7 +415,7 @@ async def analyze_full_pipeline(request: Request, body: AnalyzeRequest, db: Sess
 
 @app.post("/api/analyze-placement", response_model=PlacementScoreResponse, tags=["Analysis"])
 @limiter.limit("30/minute")
-async def analyze_placement(request: Request, body: LocationRequest, db: Session = Depends(get_db)):
+async def analyze_placement(request: Request, body: LocationRequest):
     """
     Main analysis endpoint.
     1. Fetches climate data from 3 external APIs in parallel.
@@ -329,8 +435,8 @@ async def analyze_placement(request: Request, body: LocationRequest, db: Session
     # Calculate placement score
     result = calculate_score(solar, wind, elevation)
 
-    # Persist to DB (non-blocking, best-effort)
-    save_analysis(db, {
+    # Persist to DB (non-blocking, best-effort — queued for the batch writer)
+    queue_analysis({
         "lat": body.lat,
         "lng": body.lng,
         "panel_area": body.panel_area,
@@ -346,7 +452,7 @@ async def analyze_placement(request: Request, body: LocationRequest, db: Session
         "recommendation": result["recommendation"],
     })
 
-    return PlacementScoreResponse(
+    return _dict_response(PlacementScoreResponse, dict(
         score=result["score"],
         grade=result["grade"],
         solar_irradiance=solar,
@@ -358,7 +464,7 @@ async def analyze_placement(request: Request, body: LocationRequest, db: Session
         lat=body.lat,
         lng=body.lng,
         recommendation=result["recommendation"],
-    )
+    ))
 
 
 # ── ROI Calculation ───────────────────────────────────────────────────────────
@@ -379,7 +485,7 @@ async def calculate_roi_endpoint(request: Request, body: ROIRequest):
         installation_cost=body.installation_cost,
     )
 
-    return ROIResponse(**result)
+    return ROIResponse.model_construct(**result)
 
 
 # ── AI Summary ────────────────────────────────────────────────────────────────
@@ -403,7 +509,7 @@ async def generate_summary_endpoint(request: Request, body: SummaryRequest):
         annual_savings=body.annual_savings,
     )
 
-    return SummaryResponse(**result)
+    return SummaryResponse.model_construct(**result)
 
 
 # ── Error Handlers ────────────────────────────────────────────────────────────
@@ -439,7 +545,7 @@ class LoginBody(BaseModel):
 
 
 @app.post("/api/auth/register", tags=["Auth"])
-async def register(body: RegisterBody, db: Session = Depends(get_db)):
+def register(body: RegisterBody, db: Session = Depends(get_db)):
     """Create a new account (Free tier by default)."""
     if db is None:
         raise HTTPException(503, "Database unavailable.")
@@ -456,7 +562,7 @@ async def register(body: RegisterBody, db: Session = Depends(get_db)):
 
 
 @app.post("/api/auth/login", tags=["Auth"])
-async def login(body: LoginBody, db: Session = Depends(get_db)):
+def login(body: LoginBody, db: Session = Depends(get_db)):
     """Authenticate and return a JWT token."""
     if db is None:
         raise HTTPException(503, "Database unavailable.")
@@ -475,8 +581,8 @@ async def login(body: LoginBody, db: Session = Depends(get_db)):
 
 
 @app.get("/api/auth/me", tags=["Auth"])
-async def get_me(
-    user: Optional[User] = Depends(get_current_user),
+def get_me(
+    user: Optional[CachedUser] = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
     """Return current user profile. Returns null if not authenticated."""
@@ -500,10 +606,16 @@ class DemoTierBody(BaseModel):
 
 DEMO_SECRET = os.getenv("DEMO_SECRET_KEY", "helioscope-demo-2026")
 
+def _commit_tier(db: Session, user_id: int, tier: SubscriptionTier) -> None:
+    """Blocking: store a user's new tier (run via asyncio.to_thread)."""
+    db.get(User, user_id).tier = tier
+    db.commit()
+
+
 @app.post("/api/auth/demo-tier", tags=["Auth"])
 async def switch_demo_tier(
     body: DemoTierBody,
-    user: Optional[User] = Depends(get_current_user),
+    user: Optional[CachedUser] = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
     """
@@ -520,9 +632,9 @@ async def switch_demo_tier(
     if not new_tier:
         raise HTTPException(status_code=400, detail=f"Invalid tier '{body.tier}'. Use: free/pro/enterprise")
 
-    user.tier = new_tier
-    db.commit()
-    db.refresh(user)
+    # Sync driver in a worker thread; the user cache is invalidated on the loop
+    await asyncio.to_thread(_commit_tier, db, user.id, new_tier)
+    invalidate_user(user.id)
 
     # Issue fresh JWT with new tier claim
     new_token = create_access_token(user.id, user.email, new_tier.value)
@@ -548,6 +660,14 @@ TIER_PRICES = {
     "enterprise": 199900,  # ₹1,999 × 100 paise
 }
 
+
+@lru_cache(maxsize=1)
+def _razorpay_client(key_id: str, key_secret: str):
+    """One Razorpay client (and its HTTPS session pool) per credential pair."""
+    import razorpay
+    return razorpay.Client(auth=(key_id, key_secret))
+
+
 class BillingOrderBody(BaseModel):
     tier: str   # "pro" | "enterprise"
 
@@ -559,9 +679,9 @@ class BillingVerifyBody(BaseModel):
 
 
 @app.post("/api/billing/create-order", tags=["Billing"])
-async def create_billing_order(
+def create_billing_order(
     body: BillingOrderBody,
-    user: User = Depends(require_auth),
+    user: CachedUser = Depends(require_auth),
     db: Session = Depends(get_db),
 ):
     """Create a Razorpay order for subscription upgrade."""
@@ -575,8 +695,7 @@ async def create_billing_order(
     order_id = f"mock_order_{user.id}_{body.tier}"
     if rzp_key and rzp_secret:
         try:
-            import razorpay
-            client = razorpay.Client(auth=(rzp_key, rzp_secret))
+            client = _razorpay_client(rzp_key, rzp_secret)
             order = client.order.create({
                 "amount": amount, "currency": "INR",
                 "notes": {"user_id": str(user.id), "tier": body.tier}
@@ -605,10 +724,25 @@ async def create_billing_order(
     }
 
 
+def _record_payment(db: Session, user_id: int, body: BillingVerifyBody,
+                    tier: SubscriptionTier) -> None:
+    """Blocking: upgrade the user and mark the billing record paid (run via asyncio.to_thread)."""
+    _commit_tier(db, user_id, tier)
+    record = db.scalars(
+        select(BillingRecord)
+        .where(BillingRecord.razorpay_order_id == body.razorpay_order_id)
+        .limit(1)
+    ).first()
+    if record:
+        record.razorpay_payment_id = body.razorpay_payment_id
+        record.status = "paid"
+        db.commit()
+
+
 @app.post("/api/billing/verify", tags=["Billing"])
 async def verify_billing(
     body: BillingVerifyBody,
-    user: User = Depends(require_auth),
+    user: CachedUser = Depends(require_auth),
     db: Session = Depends(get_db),
 ):
     """Verify Razorpay payment signature and upgrade user tier."""
@@ -624,10 +758,9 @@ async def verify_billing(
 
     if rzp_key and rzp_secret and not body.razorpay_order_id.startswith("mock_"):
         try:
-            import razorpay, hmac, hashlib
             msg = f"{body.razorpay_order_id}|{body.razorpay_payment_id}"
             sig = hmac.new(rzp_secret.encode(), msg.encode(), hashlib.sha256).hexdigest()
-            verified = sig == body.razorpay_signature
+            verified = hmac.compare_digest(sig, body.razorpay_signature)
         except Exception as e:
             logger.warning(f"Signature verification failed: {e}")
     else:
@@ -636,21 +769,14 @@ async def verify_billing(
     if not verified:
         raise HTTPException(400, "Payment verification failed.")
 
-    # Upgrade user tier
-    user.tier = SubscriptionTier(body.tier)
-    db.commit()
-
-    # Update billing record
-    record = db.query(BillingRecord).filter(
-        BillingRecord.razorpay_order_id == body.razorpay_order_id
-    ).first()
-    if record:
-        record.razorpay_payment_id = body.razorpay_payment_id
-        record.status = "paid"
-        db.commit()
+    # Upgrade user tier + update billing record in a worker thread (sync
+    # driver); the user cache is invalidated on the loop
+    new_tier = SubscriptionTier(body.tier)
+    await asyncio.to_thread(_record_payment, db, user.id, body, new_tier)
+    invalidate_user(user.id)
 
-    token = create_access_token(user.id, user.email, user.tier.value)
-    return {"success": True, "tier": user.tier.value, "token": token}
+    token = create_access_token(user.id, user.email, new_tier.value)
+    return {"success": True, "tier": new_tier.value, "token": token}
 
 
 # ════════════════════════════════════════════════════════════════════════════════
@@ -665,10 +791,10 @@ class EnergyRequest(BaseModel):
     energy_per_year:   Optional[float] = None
 
 
-@app.post("/api/energy/dashboard", tags=["Energy"])
+@app.post("/api/energy/dashboard", response_class=ORJSONResponse, tags=["Energy"])
 async def energy_dashboard(
     body: EnergyRequest,
-    user: User = Depends(require_pro),
+    user: CachedUser = Depends(require_pro),
 ):
     """Full energy dashboard data — live curve + forecast + surplus + carbon + P2P + blockchain."""
     daily_kwh = body.solar_irradiance * body.panel_area * body.efficiency * 5.5
@@ -681,7 +807,7 @@ async def energy_dashboard(
     p2p_market  = ed.generate_p2p_market(surplus["surplus_kwh"], body.electricity_rate)
     blockchain  = ed.generate_blockchain_ledger()
 
-    return {
+    return ORJSONResponse({
         "hourly_generation":  hourly,
         "weekly_forecast":    forecast,
         "surplus":            surplus,
@@ -690,18 +816,18 @@ async def energy_dashboard(
         "blockchain_ledger":  blockchain,
         "daily_kwh":          round(daily_kwh, 2),
         "annual_kwh":         round(annual_kwh, 2),
-    }
+    })
 
 
 @app.post("/api/energy/carbon", tags=["Energy"])
-async def carbon_endpoint(body: EnergyRequest, user: User = Depends(require_pro)):
+async def carbon_endpoint(body: EnergyRequest, user: CachedUser = Depends(require_pro)):
     """Carbon savings endpoint."""
     annual_kwh = body.energy_per_year or (body.solar_irradiance * body.panel_area * body.efficiency * 5.5 * 365)
     return ed.calculate_carbon_savings(annual_kwh)
 
 
 @app.post("/api/energy/p2p", tags=["Energy"])
-async def p2p_endpoint(body: EnergyRequest, user: User = Depends(require_enterprise)):
+async def p2p_endpoint(body: EnergyRequest, user: CachedUser = Depends(require_enterprise)):
     """P2P marketplace — Enterprise only."""
     daily_kwh = body.solar_irradiance * body.panel_area * body.efficiency * 5.5
     surplus   = ed.calculate_surplus(daily_kwh)
@@ -712,7 +838,7 @@ async def p2p_endpoint(body: EnergyRequest, user: User = Depends(require_enterpr
 
 
 @app.get("/api/energy/blockchain", tags=["Energy"])
-async def blockchain_endpoint(user: User = Depends(require_enterprise)):
+async def blockchain_endpoint(user: CachedUser = Depends(require_enterprise)):
     """Blockchain ledger — Enterprise only."""
     return {"ledger": ed.generate_blockchain_ledger(10)}
 
@@ -735,18 +861,38 @@ class HeatmapRequest(BaseModel):
     base_elevation:    float = 200.0   # reuse elevation from main analysis
 
 
-@app.post("/api/heatmap", tags=["Analysis"])
+NDJSON_MEDIA_TYPE  = "application/x-ndjson"
+NDJSON_CHUNK_CELLS = 256    # cells per write — one ASGI send per line is too chatty
+
+
+def _heatmap_ndjson(result: dict):
+    """
+    Heatmap as NDJSON: {"meta": <everything but cells>} on the first line,
+    then one cell object per line, in the same (score-descending) order.
+    """
+    meta = {k: v for k, v in result.items() if k != "cells"}
+    yield orjson.dumps({"meta": meta}, option=orjson.OPT_APPEND_NEWLINE)
+    cells = result["cells"]
+    for i in range(0, len(cells), NDJSON_CHUNK_CELLS):
+        yield b"".join(
+            orjson.dumps(cell, option=orjson.OPT_APPEND_NEWLINE)
+            for cell in cells[i:i + NDJSON_CHUNK_CELLS]
+        )
+
+
+@app.post("/api/heatmap", response_class=ORJSONResponse, tags=["Analysis"],
+          openapi_extra=_body_schema(HeatmapRequest))
 @limiter.limit("10/minute")
 async def heatmap_analysis(
     request: Request,
-    body: HeatmapRequest,
-    user: Optional[User] = Depends(get_current_user),
+    user: Optional[CachedUser] = Depends(get_current_user),
 ):
     """
     🌎 Micro-Grid Heatmap Analysis
     Divides the polygon into grid cells, scores each cell, identifies
     optimal placement sub-region, and returns grid-variance confidence calibration.
     """
+    body = await _parse_body(request, HeatmapRequest)
     if len(body.vertices) < 3:
         raise HTTPException(400, "Polygon must have at least 3 vertices.")
     if body.cell_metres < 10 or body.cell_metres > 1000:
@@ -767,7 +913,12 @@ async def heatmap_analysis(
     )
     logger.info(f"[Heatmap] {result['cell_count']} cells, mean={result['score_mean']}, "
                 f"conf_calibrated={result['confidence_calibrated']}%")
-    return result
+    # Opt-in streaming: the meta line first, then cells, so the client can
+    # start drawing before the whole grid is encoded.  Default stays one object.
+    if NDJSON_MEDIA_TYPE in request.headers.get("accept", ""):
+        return StreamingResponse(_heatmap_ndjson(result), media_type=NDJSON_MEDIA_TYPE)
+    # Plain dicts/floats only — hand straight to orjson, skipping jsonable_encoder
+    return ORJSONResponse(result)
 
 
 # ════════════════════════════════════════════════════════════════════════════════
@@ -779,7 +930,7 @@ async def seasonal_analysis(
     lat: float,
     lng: float,
     plant_size_kw: float = 10.0,
-    user: Optional[User] = Depends(get_current_user),
+    user: Optional[CachedUser] = Depends(get_current_user),
 ):
     """
     📅 Seasonal Time-Series Simulation
@@ -811,7 +962,7 @@ class TariffSensRequest(BaseModel):
 @app.post("/api/roi/sensitivity", tags=["Analysis"])
 async def tariff_sensitivity(
     body: TariffSensRequest,
-    user: Optional[User] = Depends(get_current_user),
+    user: Optional[CachedUser] = Depends(get_current_user),
 ):
     """
     📉 Tariff Sensitivity Analysis
@@ -829,10 +980,10 @@ async def tariff_sensitivity(
 # NATIONWIDE INDIA HEATMAP
 # ════════════════════════════════════════════════════════════════════════════════
 
-@app.get("/api/heatmap/nationwide", tags=["Analysis"])
+@app.get("/api/heatmap/nationwide", response_class=ORJSONResponse, tags=["Analysis"])
 async def nationwide_heatmap(
     plant_size_kw: float = 10.0,
-    user: Optional[User] = Depends(get_current_user),
+    user: Optional[CachedUser] = Depends(get_current_user),
 ):
     """
     🏭🗳️ Nationwide India Solar Heatmap
@@ -840,5 +991,5 @@ async def nationwide_heatmap(
     Uses estimated climate data — no external API calls — cached after first run.
     Returns cells with scores, top regions, and optimal national location.
     """
-    result = await compute_nationwide_heatmap(plant_size_kw=plant_size_kw)
-    return result
+    body = await nationwide_heatmap_json(plant_size_kw=plant_size_kw)
+    return Response(body, media_type="application/json")
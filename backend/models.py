@@ -1,11 +1,30 @@
 """
 HelioScope AI — Pydantic Data Models v3
 Supports 8-factor scoring engine, plant-size capacity planning, confidence score.
+
+Request models validate client input.  Response models describe output that
+main.py builds from our own scoring / ROI / LLM code, and are not validated
+per request:
+  • health / ROI / summary return model_construct() instances (no validation);
+    FastAPI's response_model pass then re-checks the dumped fields.
+  • /api/analyze and /api/analyze-placement return ORJSONResponse(dict), which
+    bypasses response_model entirely — their models are only the OpenAPI
+    schema.  The trade-off is CPU per request against a schema drift going
+    unnoticed; run with VALIDATE_RESPONSES=1 (dev / CI) to model_validate()
+    those payloads before they are sent.
 """
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from typing import Optional, List
 
 
+# Response models are assembled by our own code: extra keys are a bug, and
+# nothing mutates them after construction.  frozen holds for every instance;
+# extra="forbid" only fires where a payload is model_validate()d (the
+# VALIDATE_RESPONSES path) — model_construct() silently drops unknown keys,
+# so the response_model pass on those instances never sees them.
+RESPONSE_CONFIG = ConfigDict(extra="forbid", frozen=True)
+
+
 # ── Location / Climate ─────────────────────────────────────────────────────────
 
 class LocationRequest(BaseModel):
@@ -22,6 +41,8 @@ class ClimateData(BaseModel):
 
 
 class PlacementScoreResponse(BaseModel):
+    model_config = RESPONSE_CONFIG
+
     score: int
     grade: str
     solar_irradiance: float
@@ -47,6 +68,8 @@ class ROIRequest(BaseModel):
 
 
 class ROIResponse(BaseModel):
+    model_config = RESPONSE_CONFIG
+
     energy_output_kwh_per_year: float
     annual_savings_inr: float
     payback_years: float
@@ -67,11 +90,15 @@ class SummaryRequest(BaseModel):
 
 
 class SummaryResponse(BaseModel):
+    model_config = RESPONSE_CONFIG
+
     summary: str
     generated_by: str
 
 
 class HealthResponse(BaseModel):
+    model_config = RESPONSE_CONFIG
+
     status: str
     version: str
     services: dict
@@ -108,6 +135,8 @@ class AnalyzeResponse(BaseModel):
     """
     Full pipeline response — placement score + ROI + confidence + AI summary.
     """
+    model_config = RESPONSE_CONFIG
+
     # ── Location ─────────────────────────────────────────────────────────
     lat: float
     lng: float
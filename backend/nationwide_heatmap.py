@@ -13,10 +13,20 @@ Total compute time: <1 second (no external APIs needed)
 """
 
 import math
+import heapq
 import logging
-from typing import List, Dict
+from collections import OrderedDict
+from functools import lru_cache
+from operator import itemgetter
+from typing import List, Dict, Optional
 
-from scoring import calculate_score
+import orjson
+
+from scoring import (
+    score_solar, score_temperature, score_elevation, score_wind, score_cloud,
+    score_slope, score_grid, score_plant_size, weighted_site_sum, raw_score_from_site_sum,
+)
+from heatmap_service import SCORE_LABELS
 
 logger = logging.getLogger(__name__)
 
@@ -124,98 +134,145 @@ def _is_in_india(lat: float, lng: float) -> bool:
     return True
 
 
-# ── Main ─────────────────────────────────────────────────────────────────────
-
-# Cache — computed once per process startup
-_NATIONWIDE_CACHE: Dict = {}
+# ── Precomputed grid ─────────────────────────────────────────────────────────
+NATIONAL_SLOPE_DEG = 1.5    # flat assumption for national grid
 
 
-async def compute_nationwide_heatmap(plant_size_kw: float = 10.0) -> Dict:
+def _build_india_grid() -> tuple:
     """
-    Return pre-computed nationwide India heatmap (no API calls).
-    Cached after first computation.
+    The fixed 0.75° lattice over India with its climate estimates:
+    (lat, lng, solar, temp, cloud, wind, elev, grid_km) per in-country cell.
     """
-    cache_key = f"nat_{plant_size_kw}"
-    if cache_key in _NATIONWIDE_CACHE:
-        logger.info("[NationwideHeatmap] Returning from cache")
-        return _NATIONWIDE_CACHE[cache_key]
-
-    logger.info(f"[NationwideHeatmap] Computing grid at {GRID_DEG}° resolution…")
-    cells = []
-
+    grid = []
     lat = INDIA_LAT_MIN
     while lat <= INDIA_LAT_MAX:
         lng = INDIA_LNG_MIN
         while lng <= INDIA_LNG_MAX:
             if _is_in_india(lat, lng):
-                solar  = _estimate_solar(lat, lng)
-                temp   = _estimate_temperature(lat, lng)
-                cloud  = _estimate_cloud(lat, lng)
-                wind   = _estimate_wind(lat, lng)
-                elev   = _estimate_elevation(lat, lng)
-                grid_d = _estimate_grid_distance(lat, lng)
-
-                result = calculate_score(
-                    solar_irradiance=solar,
-                    wind_speed=wind,
-                    elevation=elev,
-                    temperature=temp,
-                    humidity=55.0,
-                    lat=lat,
-                    cloud_cover_pct=cloud,
-                    slope_degrees=1.5,       # flat assumption for national grid
-                    grid_distance_km=grid_d,
-                    plant_size_kw=plant_size_kw,
-                    available_area_m2=None,
-                    data_sources=3,
-                    apply_calibration=False,  # no regional calibration for national
-                    run_constraints=False,
-                )
-
-                score = result["score"]
-                cells.append({
-                    "lat": round(lat, 4),
-                    "lng": round(lng, 4),
-                    "score": score,
-                    "grade": result["grade"],
-                    "color": _score_to_color(score),
-                    "suitability_class": result["suitability_class"],
-                    "solar_irradiance": round(solar, 2),
-                    "cell_size_km": 83,
-                })
+                grid.append((
+                    lat, lng,
+                    _estimate_solar(lat, lng),
+                    _estimate_temperature(lat, lng),
+                    _estimate_cloud(lat, lng),
+                    _estimate_wind(lat, lng),
+                    _estimate_elevation(lat, lng),
+                    _estimate_grid_distance(lat, lng),
+                ))
             lng += GRID_DEG
         lat += GRID_DEG
+    return tuple(grid)
+
+
+# Cell centres and every plant-size-independent factor score are fixed, so
+# they're evaluated once at import; a request only adds the plant-size factor.
+_INDIA_GRID = _build_india_grid()
+# Weighted sum of the seven site factors (all but plant size), per cell
+_INDIA_SITE_SUMS = tuple(
+    weighted_site_sum((
+        score_solar(solar), score_temperature(temp), score_elevation(elev),
+        score_wind(wind), score_cloud(cloud), score_slope(NATIONAL_SLOPE_DEG),
+        score_grid(grid_d),
+    ))
+    for _, _, solar, temp, cloud, wind, elev, grid_d in _INDIA_GRID
+)
+# Per-cell (lat, lng, solar) rounded as the response emits them
+_INDIA_CELL_LABELS = tuple(
+    (round(lat, 4), round(lng, 4), round(solar, 2))
+    for lat, lng, solar, *_ in _INDIA_GRID
+)
+
+
+# ── Main ─────────────────────────────────────────────────────────────────────
+
+# Cache — computed once per process startup, keyed by plant size to 0.01 kW.
+# Bounded LRU so arbitrary ?plant_size_kw= values can't grow it without limit.
+NATIONWIDE_CACHE_SIZE = 32
+_NATIONWIDE_CACHE: "OrderedDict[str, Dict]" = OrderedDict()
+# Same keys, holding the encoded response body — the payload is ~1,300 cells
+# and identical for every request at a given plant size.
+_NATIONWIDE_JSON: "OrderedDict[str, bytes]" = OrderedDict()
+
+
+def _cache_key(plant_size_kw: float) -> str:
+    return f"nat_{plant_size_kw:.2f}"
 
-    cells.sort(key=lambda c: c["score"], reverse=True)
-    scores = [c["score"] for c in cells]
-    mean   = sum(scores) / len(scores) if scores else 0
 
-    top5_states = _identify_top_regions(cells[:20])
+async def nationwide_heatmap_json(plant_size_kw: float = 10.0) -> bytes:
+    """compute_nationwide_heatmap() pre-serialised with orjson, cached per plant size."""
+    cache_key = _cache_key(round(plant_size_kw, 2))
+    body = _NATIONWIDE_JSON.get(cache_key)
+    if body is not None:
+        _NATIONWIDE_JSON.move_to_end(cache_key)
+        return body
+    body = orjson.dumps(await compute_nationwide_heatmap(plant_size_kw))
+    _NATIONWIDE_JSON[cache_key] = body
+    if len(_NATIONWIDE_JSON) > NATIONWIDE_CACHE_SIZE:
+        _NATIONWIDE_JSON.popitem(last=False)
+    return body
+
+
+async def compute_nationwide_heatmap(plant_size_kw: float = 10.0) -> Dict:
+    """
+    Return pre-computed nationwide India heatmap (no API calls).
+    Cached after first computation.
+    """
+    plant_size_kw = round(plant_size_kw, 2)
+    cache_key = _cache_key(plant_size_kw)
+    cached = _NATIONWIDE_CACHE.get(cache_key)
+    if cached is not None:
+        _NATIONWIDE_CACHE.move_to_end(cache_key)
+        logger.info("[NationwideHeatmap] Returning from cache")
+        return cached
+
+    logger.info(f"[NationwideHeatmap] Computing grid at {GRID_DEG}° resolution…")
+    # Same scoring as calculate_score(..., available_area_m2=None,
+    # apply_calibration=False): area defaults to 2× the required land.
+    area_m2 = plant_size_kw * 8 * 2
+    plant_factor_by_solar: Dict[float, float] = {}
+    cells = []
+    for (_, _, solar, *_), (lat, lng, solar_2dp), site_sum in zip(
+            _INDIA_GRID, _INDIA_CELL_LABELS, _INDIA_SITE_SUMS):
+        f_plant = plant_factor_by_solar.get(solar)
+        if f_plant is None:
+            f_plant = plant_factor_by_solar[solar] = score_plant_size(plant_size_kw, area_m2, solar)
+        score = raw_score_from_site_sum(site_sum, f_plant)
+        grade, color, suitability = SCORE_LABELS[score]
+        cells.append({
+            "lat": lat,
+            "lng": lng,
+            "score": score,
+            "grade": grade,
+            "color": color,
+            "suitability_class": suitability,
+            "solar_irradiance": solar_2dp,
+            "cell_size_km": 83,
+        })
+
+    # Cells stay in lattice order (the map draws them all); only the top few
+    # need ranking — nlargest ties keep lattice order, like the stable sort did.
+    top_cells = heapq.nlargest(5, cells, key=itemgetter("score"))
+    mean      = sum(c["score"] for c in cells) / len(cells) if cells else 0
+
+    top5_states = _identify_top_regions(top_cells)
 
     result = {
         "cells": cells,
         "cell_count": len(cells),
         "grid_resolution_deg": GRID_DEG,
         "score_mean": round(mean, 1),
-        "optimal_cell": cells[0] if cells else None,
-        "top_cells": cells[:5],
+        "optimal_cell": top_cells[0] if top_cells else None,
+        "top_cells": top_cells,
         "top_regions": top5_states,
         "plant_size_kw": plant_size_kw,
         "note": "National heatmap uses estimated climate data — run point analysis for precise site scoring",
     }
     _NATIONWIDE_CACHE[cache_key] = result
+    if len(_NATIONWIDE_CACHE) > NATIONWIDE_CACHE_SIZE:
+        _NATIONWIDE_CACHE.popitem(last=False)
     logger.info(f"[NationwideHeatmap] {len(cells)} valid cells computed, mean score={mean:.1f}")
     return result
 
 
-def _score_to_color(score: int) -> str:
-    if score >= 80: return "#10b981"
-    if score >= 65: return "#3b82f6"
-    if score >= 50: return "#f59e0b"
-    if score >= 35: return "#f97316"
-    return "#ef4444"
-
-
 # State bounding box lookup for top regions annotation
 STATE_BOXES = {
     "Rajasthan":     (22, 30, 68, 78),
@@ -230,13 +287,24 @@ STATE_BOXES = {
     "Haryana":       (27, 31, 74, 78),
 }
 
+# Flattened for the lookup loop: (state, lat0, lat1, lng0, lng1), first match wins
+_STATE_BOX_ROWS = tuple((state, *box) for state, box in STATE_BOXES.items())
+
+
+@lru_cache(maxsize=None)   # keys are the fixed grid's cell centres
+def _state_for(lat: float, lng: float) -> Optional[str]:
+    """Approximate state for a grid cell, or None outside every box."""
+    for state, lat0, lat1, lng0, lng1 in _STATE_BOX_ROWS:
+        if lat0 <= lat <= lat1 and lng0 <= lng <= lng1:
+            return state
+    return None
+
+
 def _identify_top_regions(top_cells: List[Dict]) -> List[str]:
     """Map top cells to approximate state names."""
     named = []
     for cell in top_cells[:5]:
-        for state, (lat0, lat1, lng0, lng1) in STATE_BOXES.items():
-            if lat0 <= cell["lat"] <= lat1 and lng0 <= cell["lng"] <= lng1:
-                if state not in named:
-                    named.append(state)
-                break
+        state = _state_for(cell["lat"], cell["lng"])
+        if state is not None and state not in named:
+            named.append(state)
     return named or ["Rajasthan", "Gujarat", "Andhra Pradesh"]
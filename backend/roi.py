@@ -6,6 +6,9 @@ Derives land area, energy output, and installation cost from plant size.
 Includes PM Surya Ghar Subsidy (CFA) + degradation-aware lifetime model.
 """
 
+from bisect import bisect_left
+from functools import lru_cache
+
 SYSTEM_LIFETIME_YEARS   = 25
 DEGRADATION_RATE        = 0.005    # 0.5% annual panel degradation
 DAYS_PER_YEAR           = 365
@@ -13,6 +16,14 @@ M2_PER_KW               = 8.0     # Industry: ~8 m² per kW (crystalline Si)
 COST_PER_KW_INR         = 50_000  # ₹50,000/kW installed (India 2026 MNRE benchmark)
 EFFICIENCY_FACTOR       = 0.80    # System efficiency (inverter, wiring, mismatch)
 
+# Σ (1 − d)^yr for yr in 0..N−1 — lifetime yield per unit of first-year energy
+# (closed-form geometric series; all three inputs are constants)
+_LIFETIME_FACTOR = (1 - (1 - DEGRADATION_RATE) ** SYSTEM_LIFETIME_YEARS) / DEGRADATION_RATE
+
+# The frontend re-requests the same plant size / irradiance / tariff often;
+# the kernel is pure and returns an immutable tuple, so memoise it.
+ROI_CACHE_SIZE = 1024
+
 # ── PM Surya Ghar CFA Subsidy — MNRE 2026 ────────────────────────────────────
 PM_SURYA_GHAR_SUBSIDY = [
     (1.0,  30_000),
@@ -22,11 +33,14 @@ PM_SURYA_GHAR_SUBSIDY = [
 ]
 
 
+# Sorted slab ceilings + amounts for bisect (the None row is the open-ended cap)
+_SUBSIDY_BREAKS  = tuple(t for t, _ in PM_SURYA_GHAR_SUBSIDY if t is not None)
+_SUBSIDY_AMOUNTS = tuple(float(a) for _, a in PM_SURYA_GHAR_SUBSIDY)
+
+
 def calculate_pm_subsidy(system_kwp: float) -> float:
-    for threshold, amount in PM_SURYA_GHAR_SUBSIDY:
-        if threshold is None or system_kwp <= threshold:
-            return float(amount)
-    return 78_000.0
+    # First slab whose ceiling is >= system_kwp
+    return _SUBSIDY_AMOUNTS[bisect_left(_SUBSIDY_BREAKS, system_kwp)]
 
 
 def calculate_roi(
@@ -48,61 +62,24 @@ def calculate_roi(
     Otherwise falls back to legacy panel_area × efficiency calculation.
     """
     if plant_size_kw and plant_size_kw > 0:
-        # ── Capacity-first mode ───────────────────────────────────────────
-        required_land_m2   = plant_size_kw * M2_PER_KW
-        # kW → kWh/yr:  kW × irradiance(kWh/m²/d) × 365d × system_efficiency
-        annual_energy_kwh  = round(plant_size_kw * solar_irradiance * DAYS_PER_YEAR * EFFICIENCY_FACTOR, 1)
-        system_kwp         = plant_size_kw
-
-        # Installation cost: user override or MNRE benchmark
-        if installation_cost is None or installation_cost == 0:
-            inst_cost = plant_size_kw * COST_PER_KW_INR
-        else:
-            inst_cost = installation_cost
-
+        required_land_m2, annual_energy_kwh, system_kwp, benchmark_cost = \
+            _size_by_capacity(plant_size_kw, solar_irradiance)
     else:
-        # ── Legacy area-first mode ────────────────────────────────────────
-        required_land_m2  = panel_area
-        annual_energy_kwh = round(panel_area * efficiency * solar_irradiance * DAYS_PER_YEAR, 1)
-        system_kwp        = round(panel_area * efficiency / 1.0, 2)   # approx kWp
-
-        if installation_cost is None or installation_cost == 0:
-            inst_cost = panel_area * COST_PER_KW_INR / M2_PER_KW
-        else:
-            inst_cost = installation_cost
-
-    # ── Financial model ───────────────────────────────────────────────────
-    annual_savings    = round(annual_energy_kwh * electricity_rate, 2)
-    monthly_savings   = round(annual_savings / 12, 2)
-    daily_savings     = round(annual_savings / DAYS_PER_YEAR, 2)
-
-    payback_years     = round(inst_cost / annual_savings, 2) if annual_savings > 0 else 99.0
-
-    # Degradation-aware lifetime yield
-    lifetime_energy   = sum(
-        annual_energy_kwh * ((1 - DEGRADATION_RATE) ** yr)
-        for yr in range(SYSTEM_LIFETIME_YEARS)
-    )
-    lifetime_savings  = round(lifetime_energy * electricity_rate, 2)
-    lifetime_profit   = round(lifetime_savings - inst_cost, 2)
+        required_land_m2, annual_energy_kwh, system_kwp, benchmark_cost = \
+            _size_by_area(panel_area, efficiency, solar_irradiance)
 
-    # ── PM Surya Ghar subsidy ─────────────────────────────────────────────
-    subsidy           = calculate_pm_subsidy(system_kwp)
-    net_cost          = round(inst_cost - subsidy, 2)
-    net_payback       = round(net_cost / annual_savings, 2) if annual_savings > 0 else 99.0
-    net_lifetime_profit = round(lifetime_savings - net_cost, 2)
-
-    # ── Net Metering calculation ──────────────────────────────────────────
-    # Typical rooftop self-consumption: 70%, export 30% at 50% of retail rate
-    self_consumption_pct = 0.70
-    export_rate_pct      = 0.50   # % of retail tariff paid for exports
+    # Installation cost: user override or MNRE benchmark
+    if installation_cost is None or installation_cost == 0:
+        inst_cost = benchmark_cost
+    else:
+        inst_cost = installation_cost
 
-    self_consumed_kwh    = round(annual_energy_kwh * self_consumption_pct, 1)
-    exported_kwh         = round(annual_energy_kwh * (1 - self_consumption_pct), 1)
-    self_saved_inr       = round(self_consumed_kwh * electricity_rate, 2)
-    export_credit_inr    = round(exported_kwh * electricity_rate * export_rate_pct, 2)
-    net_metering_annual  = round(self_saved_inr + export_credit_inr, 2)
-    net_metering_payback = round(inst_cost / net_metering_annual, 2) if net_metering_annual > 0 else 99.0
+    (
+        annual_savings, monthly_savings, daily_savings, payback_years,
+        lifetime_profit, subsidy, net_cost, net_payback, net_lifetime_profit,
+        self_consumed_kwh, exported_kwh, self_saved_inr, export_credit_inr,
+        net_metering_annual, net_metering_payback,
+    ) = _roi_kernel(annual_energy_kwh, system_kwp, inst_cost, electricity_rate)
 
     return {
         # Core energy & financial
@@ -136,7 +113,78 @@ def calculate_roi(
     }
 
 
+# ── Sizing modes ──────────────────────────────────────────────────────────────
+# Each returns (required_land_m2, annual_energy_kwh, system_kwp, benchmark_cost)
+# from concrete floats; calculate_roi picks the mode and resolves the cost.
+
+def _size_by_capacity(plant_size_kw: float, solar_irradiance: float) -> tuple:
+    """Capacity-first: land, yield and MNRE benchmark cost from plant size."""
+    required_land_m2  = plant_size_kw * M2_PER_KW
+    # kW → kWh/yr:  kW × irradiance(kWh/m²/d) × 365d × system_efficiency
+    annual_energy_kwh = round(plant_size_kw * solar_irradiance * DAYS_PER_YEAR * EFFICIENCY_FACTOR, 1)
+    return required_land_m2, annual_energy_kwh, plant_size_kw, plant_size_kw * COST_PER_KW_INR
+
+
+def _size_by_area(panel_area: float, efficiency: float, solar_irradiance: float) -> tuple:
+    """Legacy area-first: yield and approximate kWp from panel area × efficiency."""
+    annual_energy_kwh = round(panel_area * efficiency * solar_irradiance * DAYS_PER_YEAR, 1)
+    system_kwp        = round(panel_area * efficiency / 1.0, 2)   # approx kWp
+    return panel_area, annual_energy_kwh, system_kwp, panel_area * COST_PER_KW_INR / M2_PER_KW
+
+
+@lru_cache(maxsize=ROI_CACHE_SIZE, typed=True)
+def _roi_kernel(
+    annual_energy_kwh: float,
+    system_kwp: float,
+    inst_cost: float,
+    electricity_rate: float,
+) -> tuple:
+    """
+    Scalar financial model shared by both sizing modes: savings, payback,
+    lifetime profit, subsidy and net metering, as a flat tuple of floats
+    (unpacked by calculate_roi in the order returned).
+    """
+    # ── Financial model ───────────────────────────────────────────────────
+    annual_savings    = round(annual_energy_kwh * electricity_rate, 2)
+    monthly_savings   = round(annual_savings / 12, 2)
+    daily_savings     = round(annual_savings / DAYS_PER_YEAR, 2)
+
+    payback_years     = round(inst_cost / annual_savings, 2) if annual_savings > 0 else 99.0
+
+    # Degradation-aware lifetime yield
+    lifetime_energy   = annual_energy_kwh * _LIFETIME_FACTOR
+    lifetime_savings  = round(lifetime_energy * electricity_rate, 2)
+    lifetime_profit   = round(lifetime_savings - inst_cost, 2)
+
+    # ── PM Surya Ghar subsidy ─────────────────────────────────────────────
+    subsidy           = calculate_pm_subsidy(system_kwp)
+    net_cost          = round(inst_cost - subsidy, 2)
+    net_payback       = round(net_cost / annual_savings, 2) if annual_savings > 0 else 99.0
+    net_lifetime_profit = round(lifetime_savings - net_cost, 2)
+
+    # ── Net Metering calculation ──────────────────────────────────────────
+    # Typical rooftop self-consumption: 70%, export 30% at 50% of retail rate
+    self_consumption_pct = 0.70
+    export_rate_pct      = 0.50   # % of retail tariff paid for exports
+
+    self_consumed_kwh    = round(annual_energy_kwh * self_consumption_pct, 1)
+    exported_kwh         = round(annual_energy_kwh * (1 - self_consumption_pct), 1)
+    self_saved_inr       = round(self_consumed_kwh * electricity_rate, 2)
+    export_credit_inr    = round(exported_kwh * electricity_rate * export_rate_pct, 2)
+    net_metering_annual  = round(self_saved_inr + export_credit_inr, 2)
+    net_metering_payback = round(inst_cost / net_metering_annual, 2) if net_metering_annual > 0 else 99.0
+
+    return (
+        annual_savings, monthly_savings, daily_savings, payback_years,
+        lifetime_profit, subsidy, net_cost, net_payback, net_lifetime_profit,
+        self_consumed_kwh, exported_kwh, self_saved_inr, export_credit_inr,
+        net_metering_annual, net_metering_payback,
+    )
+
+
 # ── Tariff sensitivity table ─────────────────────────────────────────────────
+DEFAULT_TARIFF_RATES = (4.0, 5.0, 6.0, 7.0, 8.0, 9.0, 10.0, 12.0, 15.0)   # ₹/kWh
+
 
 def calculate_tariff_sensitivity(
     solar_irradiance: float,
@@ -149,16 +197,15 @@ def calculate_tariff_sensitivity(
     at various electricity tariff rates for sensitivity chart.
     """
     if tariff_rates is None:
-        tariff_rates = [4.0, 5.0, 6.0, 7.0, 8.0, 9.0, 10.0, 12.0, 15.0]
+        tariff_rates = DEFAULT_TARIFF_RATES
 
     annual_energy = plant_size_kw * solar_irradiance * DAYS_PER_YEAR * EFFICIENCY_FACTOR
-    results = []
-    for rate in tariff_rates:
-        savings  = round(annual_energy * rate, 0)
-        payback  = round(installation_cost / savings, 2) if savings > 0 else 99.0
-        results.append({
+    savings = [round(annual_energy * rate, 0) for rate in tariff_rates]
+    return [
+        {
             "tariff_rate":       rate,
-            "annual_savings_inr": savings,
-            "payback_years":     payback,
-        })
-    return results
+            "annual_savings_inr": s,
+            "payback_years":     round(installation_cost / s, 2) if s > 0 else 99.0,
+        }
+        for rate, s in zip(tariff_rates, savings)
+    ]
@@ -22,8 +22,9 @@ Adaptive EMA calibrator adjusts scores using regional historical data.
 
 import math
 import logging
+from bisect import bisect_left
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Dict, Iterable, List, Optional, Tuple
 
 logger = logging.getLogger(__name__)
 
@@ -40,6 +41,10 @@ WEIGHTS = {
 }
 assert abs(sum(WEIGHTS.values()) - 1.0) < 1e-9, "Weights must sum to 1.0"
 
+# Positional copies for the unrolled weighted sums below (WEIGHTS order)
+(_W_SOLAR, _W_TEMP, _W_ELEV, _W_WIND,
+ _W_CLOUD, _W_SLOPE, _W_GRID, _W_PLANT) = WEIGHTS.values()
+
 
 # ═══════════════════════════════════════════════════════════════════════════════
 # SECTION 1 — Primitive normalisation functions
@@ -189,6 +194,7 @@ def calculate_confidence(
     slope: float,
     grid_km: float,
     data_sources: int = 3,  # number of live API sources that responded
+    sub_scores: Optional[Tuple[float, float, float, float]] = None,
 ) -> float:
     """
     Confidence score (0-100%) based on:
@@ -196,18 +202,21 @@ def calculate_confidence(
     2. Data source quality — how many live APIs responded vs fallback estimates?
     3. Input plausibility — are values within realistic physical ranges?
 
+    sub_scores: (solar, temperature, wind, cloud) factor scores for these
+    inputs, if the caller already has them; otherwise they're computed here.
+
     Returns a float 0-100.
     """
-    scores_01 = [
-        score_solar(solar),
-        score_temperature(temp),
-        score_wind(wind),
-        score_cloud(cloud),
-    ]
+    if sub_scores is None:
+        sub_scores = (
+            score_solar(solar), score_temperature(temp), score_wind(wind), score_cloud(cloud),
+        )
+    s_solar, s_temp, s_wind, s_cloud = sub_scores
 
     # Factor agreement: low variance in sub-scores → higher confidence
-    mean_s = sum(scores_01) / len(scores_01)
-    variance = sum((s - mean_s)**2 for s in scores_01) / len(scores_01)
+    mean_s = (s_solar + s_temp + s_wind + s_cloud) / 4
+    variance = ((s_solar - mean_s)**2 + (s_temp - mean_s)**2
+                + (s_wind - mean_s)**2 + (s_cloud - mean_s)**2) / 4
     agreement = clamp(1.0 - variance / 0.25)   # 0.25 = max expected variance
 
     # Data source bonus
@@ -311,17 +320,26 @@ class AdaptiveCalibrator:
         # {region_key: {"ema_score": float, "n": int, "ema_residual": float}}
         self._cache: dict = {}
 
-    def _key(self, lat: float, lng: float) -> str:
-        return f"{round(lat/5)*5}_{round(lng/5)*5}"
+    @staticmethod
+    def _buckets(lat: float, lng: float) -> tuple:
+        return round(lat / 5) * 5, round(lng / 5) * 5
+
+    def _key(self, lat: float, lng: float) -> int:
+        # Packed int of the 5° buckets: cheaper to hash than a formatted string
+        lat_b, lng_b = self._buckets(lat, lng)
+        return (lat_b + 90) * 1000 + (lng_b + 180)
 
     def record(self, lat: float, lng: float, score: float) -> None:
-        key = self._key(lat, lng)
-        if key not in self._cache:
-            self._cache[key] = {"ema_score": score, "n": 1, "ema_residual": 0.0}
+        self._record_entry(self._key(lat, lng), score)
+
+    def _record_entry(self, key: int, score: float) -> dict:
+        e = self._cache.get(key)
+        if e is None:
+            e = self._cache[key] = {"ema_score": score, "n": 1, "ema_residual": 0.0}
         else:
-            e = self._cache[key]
             e["ema_score"] = self.EMA_ALPHA * score + (1 - self.EMA_ALPHA) * e["ema_score"]
             e["n"] += 1
+        return e
 
     def record_residual(self, lat: float, lng: float, actual: float, predicted: float) -> None:
         """Record actual-vs-predicted residual for bias correction."""
@@ -334,8 +352,9 @@ class AdaptiveCalibrator:
         entry["n"] = entry.get("n", 0) + 1
 
     def adjustment(self, lat: float, lng: float, raw_score: float) -> float:
-        key = self._key(lat, lng)
-        entry = self._cache.get(key)
+        return self._entry_adjustment(self._cache.get(self._key(lat, lng)))
+
+    def _entry_adjustment(self, entry: Optional[dict]) -> float:
         if not entry or entry.get("n", 0) < self.MIN_SAMPLES:
             return 0.0
 
@@ -347,15 +366,29 @@ class AdaptiveCalibrator:
         return max(-self.MAX_ADJUST, min(self.MAX_ADJUST, combined))
 
     def regional_stats(self, lat: float, lng: float) -> dict:
-        key = self._key(lat, lng)
-        entry = self._cache.get(key, {})
+        return self._entry_stats(lat, lng, self._cache.get(self._key(lat, lng), {}))
+
+    def _entry_stats(self, lat: float, lng: float, entry: dict) -> dict:
+        lat_b, lng_b = self._buckets(lat, lng)
         return {
-            "region": key,
+            "region": f"{lat_b}_{lng_b}",
             "n_analyses": entry.get("n", 0),
             "ema_score": round(entry.get("ema_score", 65.0), 1),
             "ema_residual": round(entry.get("ema_residual", 0.0), 2),
         }
 
+    def step(
+        self, lat: float, lng: float, raw_score: float, stats: bool = False,
+    ) -> Tuple[float, Optional[dict]]:
+        """
+        adjustment() → record() → regional_stats() (when stats=True) for one
+        scored site, sharing a single key computation and entry lookup.
+        """
+        key = self._key(lat, lng)
+        adj = self._entry_adjustment(self._cache.get(key))
+        entry = self._record_entry(key, raw_score)
+        return adj, (self._entry_stats(lat, lng, entry) if stats else None)
+
     def load_from_db(self, db_session) -> None:
         try:
             from database import AnalysisResult
@@ -387,7 +420,148 @@ def get_calibrator() -> AdaptiveCalibrator:
 
 
 # ═══════════════════════════════════════════════════════════════════════════════
-# SECTION 6 — Main scoring function
+# SECTION 6 — Numeric scoring kernel
+# ═══════════════════════════════════════════════════════════════════════════════
+# Pure float-in / tuple-out core of calculate_score: no defaults, dicts,
+# calibration or logging, so batch callers (heatmap cells, nationwide grid)
+# can reuse it directly.
+
+def score_factors(
+    solar: float,
+    temp: float,
+    elevation: float,
+    wind: float,
+    cloud: float,
+    slope: float,
+    grid_km: float,
+    plant_kw: float,
+    area_m2: float,
+) -> tuple:
+    """Per-factor scores [0, 1], in WEIGHTS order."""
+    return (
+        score_solar(solar),
+        score_temperature(temp),
+        score_elevation(elevation),
+        score_wind(wind),
+        score_cloud(cloud),
+        score_slope(slope),
+        score_grid(grid_km),
+        score_plant_size(plant_kw, area_m2, solar),
+    )
+
+
+def raw_score_from_factors(factors: tuple) -> int:
+    """Weighted 0-100 score before calibration."""
+    solar, temp, elev, wind, cloud, slope, grid, plant = factors
+    raw_01 = (_W_SOLAR * solar + _W_TEMP * temp + _W_ELEV * elev + _W_WIND * wind
+              + _W_CLOUD * cloud + _W_SLOPE * slope + _W_GRID * grid + _W_PLANT * plant)
+    # Scale to 0-100 (raw_01 max ≈ 0.97, scale ×105 → high-achievers reach 95+)
+    return round(clamp(raw_01 * 105, 0, 100))
+
+
+# Split form for grids whose site factors are fixed and only plant size varies:
+# weighted_site_sum() once per cell, raw_score_from_site_sum() per request.
+# Same left-to-right summation as raw_score_from_factors, so scores are identical.
+def weighted_site_sum(site_factors: tuple) -> float:
+    """Weighted sum of the seven site factors (WEIGHTS order, plant size last)."""
+    solar, temp, elev, wind, cloud, slope, grid = site_factors
+    return (_W_SOLAR * solar + _W_TEMP * temp + _W_ELEV * elev + _W_WIND * wind
+            + _W_CLOUD * cloud + _W_SLOPE * slope + _W_GRID * grid)
+
+
+def raw_score_from_site_sum(site_sum: float, plant_factor: float) -> int:
+    """raw_score_from_factors(site_factors + (plant_factor,)) from the site sum."""
+    return round(clamp((site_sum + _W_PLANT * plant_factor) * 105, 0, 100))
+
+
+def raw_score_batch(
+    cells: Iterable[Tuple[float, float, float]],
+    solar_irradiance: float,
+    wind_speed: float,
+    temperature: Optional[float] = None,
+    cloud_cover_pct: Optional[float] = None,
+    grid_distance_km: Optional[float] = None,
+    plant_size_kw: Optional[float] = None,
+    available_area_m2: Optional[float] = None,
+) -> List[int]:
+    """
+    Uncalibrated 0-100 scores for many (lat, elevation, slope_degrees) cells
+    of one site.  Pure — touches no shared state, so it may run in a worker
+    thread; apply calibrate_scores() to the result on the event loop.
+
+    Site-wide factors (solar, wind, cloud, grid, plant size) are scored once;
+    only elevation/slope (and temperature, when estimated from latitude) are
+    scored per cell, memoised because cells share a handful of distinct values.
+    """
+    _cloud    = cloud_cover_pct if cloud_cover_pct is not None else 40.0
+    _grid_km  = grid_distance_km if grid_distance_km is not None else 15.0
+    _plant_kw = plant_size_kw  if plant_size_kw  is not None else 10.0
+    _area_m2  = available_area_m2 if available_area_m2 is not None else _plant_kw * 8 * 2
+
+    f_solar = score_solar(solar_irradiance)
+    f_wind  = score_wind(wind_speed)
+    f_cloud = score_cloud(_cloud)
+    f_grid  = score_grid(_grid_km)
+    f_plant = score_plant_size(_plant_kw, _area_m2, solar_irradiance)
+
+    raw_by_terrain: Dict[Tuple[float, float, float], int] = {}
+    scores = []
+    for lat, elevation, slope in cells:
+        temp = temperature if temperature is not None else _estimate_temp(lat)
+        key = (elevation, slope, temp)
+        raw_score = raw_by_terrain.get(key)
+        if raw_score is None:
+            raw_score = raw_score_from_factors((
+                f_solar, score_temperature(temp), score_elevation(elevation), f_wind,
+                f_cloud, score_slope(slope), f_grid, f_plant,
+            ))
+            raw_by_terrain[key] = raw_score
+        scores.append(raw_score)
+    return scores
+
+
+def calibrate_scores(lats: Iterable[float], raw_scores: Iterable[int]) -> List[int]:
+    """
+    Final scores from raw_score_batch() output: the calibrator adjust/record
+    sequence calculate_score applies, cell by cell in order.  Mutates the
+    shared calibrator, so call it from the event loop only.
+    """
+    step = _calibrator.step
+    return [
+        int(clamp(raw_score + step(lat, 0.0, raw_score)[0], 0, 100))
+        for lat, raw_score in zip(lats, raw_scores)
+    ]
+
+
+def score_batch(
+    cells: Iterable[Tuple[float, float, float]],
+    solar_irradiance: float,
+    wind_speed: float,
+    temperature: Optional[float] = None,
+    cloud_cover_pct: Optional[float] = None,
+    grid_distance_km: Optional[float] = None,
+    plant_size_kw: Optional[float] = None,
+    available_area_m2: Optional[float] = None,
+    apply_calibration: bool = True,
+) -> List[int]:
+    """
+    Final 0-100 scores for many (lat, elevation, slope_degrees) cells of one
+    site, equal to calculate_score(...)["score"] per cell (including the
+    calibrator adjust/record sequence), without building the full result dict.
+    With apply_calibration it mutates the calibrator — event loop only.
+    """
+    cells = list(cells)
+    raw_scores = raw_score_batch(
+        cells, solar_irradiance, wind_speed, temperature, cloud_cover_pct,
+        grid_distance_km, plant_size_kw, available_area_m2,
+    )
+    if not apply_calibration:
+        return raw_scores
+    return calibrate_scores([lat for lat, _, _ in cells], raw_scores)
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# SECTION 7 — Main scoring function
 # ═══════════════════════════════════════════════════════════════════════════════
 
 def calculate_score(
@@ -431,33 +605,21 @@ def calculate_score(
             solar_irradiance, _slope, _cloud, _grid_km, _area_m2, _plant_kw
         )
 
-    # ── Per-factor scores [0, 1] ──────────────────────────────────────────
-    f = {
-        "solar":      score_solar(solar_irradiance),
-        "temperature": score_temperature(_temp),
-        "elevation":  score_elevation(elevation),
-        "wind":       score_wind(wind_speed),
-        "cloud":      score_cloud(_cloud),
-        "slope":      score_slope(_slope),
-        "grid":       score_grid(_grid_km),
-        "plant_size": score_plant_size(_plant_kw, _area_m2, solar_irradiance),
-    }
-
-    # ── Weighted combination ──────────────────────────────────────────────
-    raw_01 = sum(WEIGHTS[k] * v for k, v in f.items())
-
-    # Scale to 0-100 (raw_01 max ≈ 0.97, scale ×105 → high-achievers reach 95+)
-    raw_score = round(clamp(raw_01 * 105, 0, 100))
+    # ── Per-factor scores [0, 1] + weighted raw score ─────────────────────
+    factors = score_factors(
+        solar_irradiance, _temp, elevation, wind_speed,
+        _cloud, _slope, _grid_km, _plant_kw, _area_m2,
+    )
+    raw_score = raw_score_from_factors(factors)
 
     # ── Adaptive calibration ──────────────────────────────────────────────
     calib_adj = 0.0
     regional_stats_data = {}
     if apply_calibration and lat is not None:
-        calib_adj = _calibrator.adjustment(_lat, 0.0, raw_score)
-        _calibrator.record(_lat, 0.0, raw_score)
-        regional_stats_data = _calibrator.regional_stats(_lat, 0.0)
+        calib_adj, regional_stats_data = _calibrator.step(_lat, 0.0, raw_score, stats=True)
 
     final_score = int(clamp(raw_score + calib_adj, 0, 100))
+    s_solar, s_temp, s_elev, s_wind, s_cloud, s_slope, s_grid, s_plant = factors
 
     # ── Confidence ────────────────────────────────────────────────────────
     confidence = calculate_confidence(
@@ -469,38 +631,41 @@ def calculate_score(
         slope=_slope,
         grid_km=_grid_km,
         data_sources=data_sources,
+        sub_scores=(s_solar, s_temp, s_wind, s_cloud),
     )
 
-    # ── Suitability class ─────────────────────────────────────────────────
-    suitability = get_suitability_class(final_score)
-
-    logger.info(
-        f"[SCOREv3] lat={_lat:.2f} solar={solar_irradiance:.2f} wind={wind_speed:.1f} "
-        f"elev={elevation:.0f}m temp={_temp:.1f}°C cloud={_cloud:.0f}% "
-        f"slope={_slope:.1f}° grid={_grid_km:.0f}km plant={_plant_kw:.0f}kW "
-        f"→ raw={raw_score} adj={calib_adj:+.1f} final={final_score} "
-        f"conf={confidence}% suitability={suitability}"
-    )
+    # ── Grade / suitability / recommendation ──────────────────────────────
+    grade, suitability, recommendation = _SCORE_TEXT[final_score]
+
+    # The f-string is built eagerly, so skip it when INFO is filtered out
+    if logger.isEnabledFor(logging.INFO):
+        logger.info(
+            f"[SCOREv3] lat={_lat:.2f} solar={solar_irradiance:.2f} wind={wind_speed:.1f} "
+            f"elev={elevation:.0f}m temp={_temp:.1f}°C cloud={_cloud:.0f}% "
+            f"slope={_slope:.1f}° grid={_grid_km:.0f}km plant={_plant_kw:.0f}kW "
+            f"→ raw={raw_score} adj={calib_adj:+.1f} final={final_score} "
+            f"conf={confidence}% suitability={suitability}"
+        )
 
     return {
         # Core output
         "score":       final_score,
-        "grade":       get_grade(final_score),
+        "grade":       grade,
         "confidence":  confidence,
-        "recommendation": get_recommendation(final_score),
+        "recommendation": recommendation,
         "suitability_class": suitability,
         "constraint_violations": violations,
         "is_suitable": len(violations) == 0,
 
         # Per-factor scores (0-100 for display)
-        "solar_score":       round(f["solar"]       * 100, 1),
-        "temperature_score": round(f["temperature"] * 100, 1),
-        "elevation_score":   round(f["elevation"]   * 100, 1),
-        "wind_score":        round(f["wind"]         * 100, 1),
-        "cloud_score":       round(f["cloud"]        * 100, 1),
-        "slope_score":       round(f["slope"]        * 100, 1),
-        "grid_score":        round(f["grid"]         * 100, 1),
-        "plant_size_score":  round(f["plant_size"]   * 100, 1),
+        "solar_score":       round(s_solar * 100, 1),
+        "temperature_score": round(s_temp  * 100, 1),
+        "elevation_score":   round(s_elev  * 100, 1),
+        "wind_score":        round(s_wind  * 100, 1),
+        "cloud_score":       round(s_cloud * 100, 1),
+        "slope_score":       round(s_slope * 100, 1),
+        "grid_score":        round(s_grid  * 100, 1),
+        "plant_size_score":  round(s_plant * 100, 1),
 
         # Calibration metadata
         "calibration_adjustment": round(calib_adj, 2),
@@ -510,7 +675,7 @@ def calculate_score(
 
 
 # ═══════════════════════════════════════════════════════════════════════════════
-# SECTION 7 — Grade / Suitability / Recommendation helpers
+# SECTION 8 — Grade / Suitability / Recommendation helpers
 # ═══════════════════════════════════════════════════════════════════════════════
 
 def get_grade(score: int) -> str:
@@ -547,13 +712,18 @@ def get_recommendation(score: int) -> str:
     return "Not Recommended — Poor solar resource. High investment risk."
 
 
+# Final scores are integers 0-100: (grade, suitability class, recommendation)
+# per score, so calculate_score indexes once instead of walking three ladders.
+_SCORE_TEXT = tuple(
+    (get_grade(s), get_suitability_class(s), get_recommendation(s)) for s in range(101)
+)
+
+
 # ── Utility fallbacks ─────────────────────────────────────────────────────────
+# Upper |lat| bound of each band (inclusive) → mean temperature (°C)
+_TEMP_BAND_BOUNDS = (10, 20, 30, 40, 50, 60)
+_TEMP_BAND_MEANS  = (28.0, 26.0, 24.0, 18.0, 10.0, 4.0, -5.0)
+
+
 def _estimate_temp(lat: float) -> float:
-    a = abs(lat)
-    if a <= 10:  return 28.0
-    if a <= 20:  return 26.0
-    if a <= 30:  return 24.0
-    if a <= 40:  return 18.0
-    if a <= 50:  return 10.0
-    if a <= 60:  return 4.0
-    return -5.0
+    return _TEMP_BAND_MEANS[bisect_left(_TEMP_BAND_BOUNDS, abs(lat))]
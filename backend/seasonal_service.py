@@ -7,19 +7,42 @@ stability index (coefficient of variation).
 """
 
 import math
+import asyncio
 import logging
-import httpx
+from bisect import bisect_right
+from collections import OrderedDict
+from functools import lru_cache
 from typing import Dict, List, Optional
 
+import orjson
+
+from http_client import get_client
+
 logger = logging.getLogger(__name__)
 
-MONTHS = ["Jan","Feb","Mar","Apr","May","Jun","Jul","Aug","Sep","Oct","Nov","Dec"]
+# Tuples: shared by every response dict, so they must not be mutable
+MONTHS = ("Jan","Feb","Mar","Apr","May","Jun","Jul","Aug","Sep","Oct","Nov","Dec")
 NASA_BASE = "https://power.larc.nasa.gov/api"
 TIMEOUT   = 20.0
 
+# Climatology is a long-term average, so live results are cached per ~1 km
+# site (lat/lng rounded to 2 dp, about the POWER grid's effective resolution)
+CACHE_DECIMALS  = 2
+CACHE_MAX_SITES = 50_000
+_monthly_cache: "OrderedDict[tuple[float, float], Dict]" = OrderedDict()
+# Concurrent misses for the same site share one POWER request (entries live
+# only while in flight)
+_inflight: "dict[tuple[float, float], asyncio.Task]" = {}
+
 # Performance factor (same as ROI engine)
 PERF_RATIO = 0.80
-DAYS_PER_MONTH = [31,28,31,30,31,30,31,31,30,31,30,31]
+DAYS_PER_MONTH = (31,28,31,30,31,30,31,31,30,31,30,31)
+# kWh per kW of plant per (kWh/m²/day) of irradiance, month by month
+_GEN_PER_KW_FACTORS = tuple(days * PERF_RATIO for days in DAYS_PER_MONTH)
+
+# Fallback model: upper |lat| bound of each band (exclusive) → annual mean irradiance
+_LAT_BAND_BOUNDS = (15, 25, 35, 50)
+_LAT_BAND_MEANS  = (6.2, 6.0, 5.5, 4.5, 3.0)
 
 
 async def fetch_monthly_irradiance(lat: float, lng: float) -> Dict:
@@ -39,6 +62,24 @@ async def fetch_monthly_irradiance(lat: float, lng: float) -> Dict:
             months: [str × 12],
         }
     """
+    lat, lng = round(lat, CACHE_DECIMALS), round(lng, CACHE_DECIMALS)
+    key = (lat, lng)
+    cached = _monthly_cache.get(key)
+    if cached is not None:
+        _monthly_cache.move_to_end(key)
+        return dict(cached)   # callers add plant-size keys to their copy
+
+    task = _inflight.get(key)
+    if task is None:
+        task = asyncio.create_task(_fetch_monthly(lat, lng))
+        _inflight[key] = task
+        task.add_done_callback(lambda _t: _inflight.pop(key, None))
+    # Shielded: one caller being cancelled must not cancel the others' fetch
+    return dict(await asyncio.shield(task))
+
+
+async def _fetch_monthly(lat: float, lng: float) -> Dict:
+    """POWER climatology → seasonal response (cached), or the fallback model's."""
     url = (
         f"{NASA_BASE}/temporal/climatology/point"
         f"?parameters=ALLSKY_SFC_SW_DWN"
@@ -48,46 +89,55 @@ async def fetch_monthly_irradiance(lat: float, lng: float) -> Dict:
 
     irr = None
     try:
-        async with httpx.AsyncClient(timeout=TIMEOUT) as client:
-            r = await client.get(url)
-            r.raise_for_status()
-            data = r.json()
-            props = data.get("properties", {}).get("parameter", {})
-            raw = props.get("ALLSKY_SFC_SW_DWN", {})
-            # Climatology keys: "JAN","FEB",..."DEC" (+ "ANN")
-            irr = [
-                float(raw.get(m.upper(), -999))
-                for m in MONTHS
-            ]
-            # Filter fill values
-            irr = [max(0.0, v) if v > -900 else None for v in irr]
+        r = await get_client().get(url, timeout=TIMEOUT)
+        r.raise_for_status()
+        data = orjson.loads(r.content)
+        props = data.get("properties", {}).get("parameter", {})
+        raw = props.get("ALLSKY_SFC_SW_DWN", {})
+        # Climatology keys: "JAN","FEB",..."DEC" (+ "ANN")
+        irr = [
+            float(raw.get(m.upper(), -999))
+            for m in MONTHS
+        ]
+        # Filter fill values
+        irr = [max(0.0, v) if v > -900 else None for v in irr]
     except Exception as e:
         logger.warning(f"[Seasonal] NASA climatology failed ({e}), estimating.")
 
-    # Fallback: latitude-based model
+    # Fallback: latitude-based model (not cached per site — retry the API next time)
     if irr is None or any(v is None for v in irr):
-        irr = _estimate_monthly(lat)
+        return _estimated_response(*_estimate_params(lat))
+
+    response = _build_response(irr)
+    _monthly_cache[(lat, lng)] = response
+    if len(_monthly_cache) > CACHE_MAX_SITES:
+        _monthly_cache.popitem(last=False)
+    return response
+
+
+def _estimate_params(lat: float) -> tuple[float, int]:
+    """(annual mean irradiance for the latitude band, summer month) of the fallback model."""
+    annual_mean = _LAT_BAND_MEANS[bisect_right(_LAT_BAND_BOUNDS, abs(lat))]
 
-    return _build_response(irr)
+    # Summer = month 6 (Jun) for N hemisphere, month 12 (Dec) for S
+    summer_month = 6 if lat >= 0 else 12
+    return annual_mean, summer_month
+
+
+@lru_cache(maxsize=None)   # 5 latitude bands × 2 hemispheres
+def _estimated_response(annual_mean: float, summer_month: int) -> Dict:
+    """Seasonal response for the fallback model — identical for a whole band."""
+    return _build_response(_estimate_monthly(annual_mean, summer_month))
 
 
-def _estimate_monthly(lat: float) -> List[float]:
+def _estimate_monthly(annual_mean: float, summer_month: int) -> List[float]:
     """
     Simple sinusoidal model for monthly irradiance:
       • Annual mean from latitude band
       • Seasonal amplitude peaks in summer (December for southern hemisphere)
     """
-    abs_lat = abs(lat)
-    if abs_lat < 15:   annual_mean = 6.2
-    elif abs_lat < 25: annual_mean = 6.0
-    elif abs_lat < 35: annual_mean = 5.5
-    elif abs_lat < 50: annual_mean = 4.5
-    else:               annual_mean = 3.0
     amplitude = annual_mean * 0.3
 
-    # Summer = month 6 (Jun) for N hemisphere, month 12 (Dec) for S
-    summer_month = 6 if lat >= 0 else 12
-
     monthly = []
     for m in range(1, 13):
         phase = 2 * math.pi * (m - summer_month) / 12
@@ -104,13 +154,13 @@ def _build_response(irr: List[float]) -> Dict:
 
     # Monthly generation (kWh) for 1 kW plant (scale by actual kW on front-end)
     monthly_gen_per_kw = [
-        round(irr[i] * DAYS_PER_MONTH[i] * PERF_RATIO, 1)
-        for i in range(12)
+        round(v * factor, 1) for v, factor in zip(irr, _GEN_PER_KW_FACTORS)
     ]
     annual_per_kw = round(sum(monthly_gen_per_kw), 1)
 
-    peak_idx   = irr.index(max(irr))
-    trough_idx = irr.index(min(irr))
+    # First month at the max / min (same tie-break as irr.index(max(irr)))
+    peak_idx   = max(range(12), key=irr.__getitem__)
+    trough_idx = min(range(12), key=irr.__getitem__)
 
     return {
         "monthly_irradiance":      [round(v, 2) for v in irr],
@@ -118,8 +168,8 @@ def _build_response(irr: List[float]) -> Dict:
         "annual_kwh_per_kw":       annual_per_kw,
         "peak_month":              MONTHS[peak_idx],
         "trough_month":            MONTHS[trough_idx],
-        "peak_irradiance":         round(max(irr), 2),
-        "trough_irradiance":       round(min(irr), 2),
+        "peak_irradiance":         round(irr[peak_idx], 2),
+        "trough_irradiance":       round(irr[trough_idx], 2),
         "annual_mean_irradiance":  round(mean_irr, 2),
         "stability_index":         stability,             # 0-100 (100=very stable)
         "cv_percent":              round(cv, 1),
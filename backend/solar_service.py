@@ -4,15 +4,56 @@ Fetches solar irradiance from NASA POWER API (daily/point endpoint).
 Uses a 30-day window of recent data and averages for a reliable result.
 """
 
-import httpx
+import asyncio
 import logging
+import time
+from bisect import bisect_left
+from collections import OrderedDict
 from datetime import datetime, timedelta
 
+import orjson
+
+from http_client import get_client
+
 logger = logging.getLogger(__name__)
 
 POWER_DAILY_URL = "https://power.larc.nasa.gov/api/temporal/daily/point"
 POWER_CLIMATOLOGY_URL = "https://power.larc.nasa.gov/api/temporal/climatology/point"
 
+# Daily data is preferred for this long before the climatology request starts,
+# and wins over an in-flight climatology answer until DAILY_PREFERENCE_S
+CLIMATOLOGY_HEADSTART_S = 1.0
+DAILY_PREFERENCE_S      = 3.0
+
+# The 365-day window only moves a day at a time, so live results are cached
+# per ~1 km site (lat/lng rounded to 2 dp, finer than the POWER grid) for a day.
+CACHE_DECIMALS  = 2
+CACHE_MAX_SITES = 50_000
+CACHE_TTL_S     = 24 * 3600
+_solar_cache: "OrderedDict[tuple[float, float], tuple[float, float]]" = OrderedDict()
+# Concurrent misses for the same site share one fetch (entries live only while in flight)
+_inflight: "dict[tuple[float, float], asyncio.Task]" = {}
+
+
+def _cached(key: tuple[float, float]) -> float | None:
+    hit = _solar_cache.get(key)
+    if hit is None:
+        return None
+    irradiance, valid_until = hit
+    if time.time() >= valid_until:
+        del _solar_cache[key]
+        return None
+    _solar_cache.move_to_end(key)
+    return irradiance
+
+
+def _remember(key: tuple[float, float], irradiance: float) -> float:
+    _solar_cache[key] = (irradiance, time.time() + CACHE_TTL_S)
+    _solar_cache.move_to_end(key)
+    if len(_solar_cache) > CACHE_MAX_SITES:
+        _solar_cache.popitem(last=False)
+    return irradiance
+
 
 def _date_range_params() -> tuple[str, str]:
     """Return (start, end) date strings for the last 365 days."""
@@ -28,8 +69,63 @@ async def fetch_solar_irradiance(lat: float, lng: float) -> float:
     Primary: temporal/daily/point  (last 12 months, parameter: ALLSKY_SFC_SW_DWN)
     Fallback: temporal/climatology/point  (long-term annual average)
     Final fallback: latitude-based estimate
+
+    The climatology request is started once daily has failed or had its
+    CLIMATOLOGY_HEADSTART_S, so a slow daily endpoint doesn't cost a second
+    serial round-trip; daily still wins if it answers by DAILY_PREFERENCE_S.
+
+    Live results are cached per rounded lat/lng site for CACHE_TTL_S;
+    estimates are not (the API is retried next time).
     """
-    # ── 1st attempt: daily endpoint (last 365 days) ────────────────────────
+    key = (round(lat, CACHE_DECIMALS), round(lng, CACHE_DECIMALS))
+    cached = _cached(key)
+    if cached is not None:
+        return cached
+
+    task = _inflight.get(key)
+    if task is None:
+        task = asyncio.create_task(_fetch_solar_irradiance(lat, lng, key))
+        _inflight[key] = task
+        task.add_done_callback(lambda _t: _inflight.pop(key, None))
+    # Shielded: one caller's budget running out must not cancel the others' fetch
+    return await asyncio.shield(task)
+
+
+async def _fetch_solar_irradiance(lat: float, lng: float, key: tuple[float, float]) -> float:
+    """Daily → climatology → estimate for one site; live results go into the cache."""
+    daily = asyncio.create_task(_try_daily(lat, lng))
+    climatology = None
+    try:
+        done, _ = await asyncio.wait({daily}, timeout=CLIMATOLOGY_HEADSTART_S)
+        if done and daily.result() is not None:
+            return _remember(key, daily.result())
+
+        climatology = asyncio.create_task(_try_climatology(lat, lng))
+        if not done:
+            done, _ = await asyncio.wait(
+                {daily}, timeout=DAILY_PREFERENCE_S - CLIMATOLOGY_HEADSTART_S
+            )
+            if done and daily.result() is not None:
+                return _remember(key, daily.result())
+
+        # Daily failed (or is late): first valid answer from whatever is left
+        for next_done in asyncio.as_completed([climatology] if done else [daily, climatology]):
+            irradiance = await next_done
+            if irradiance is not None:
+                return _remember(key, irradiance)
+    finally:
+        for t in (daily, climatology):
+            if t is not None:
+                t.cancel()
+
+    # ── Final fallback: latitude-based estimate ────────────────────────────
+    estimate = _estimate_solar_irradiance(lat)
+    logger.warning(f"Using latitude estimate: {estimate} kWh/m²/d")
+    return estimate
+
+
+async def _try_daily(lat: float, lng: float) -> float | None:
+    """Mean of the last 365 days from temporal/daily/point. None on any failure."""
     start, end = _date_range_params()
     daily_params = {
         "parameters": "ALLSKY_SFC_SW_DWN",
@@ -42,26 +138,26 @@ async def fetch_solar_irradiance(lat: float, lng: float) -> float:
     }
 
     try:
-        async with httpx.AsyncClient(timeout=20.0) as client:
-            resp = await client.get(POWER_DAILY_URL, params=daily_params)
-            resp.raise_for_status()
-            data = resp.json()
-
-            values = list(
-                data["properties"]["parameter"]["ALLSKY_SFC_SW_DWN"].values()
-            )
-            # POWER uses -999 as fill value for missing data
-            valid = [v for v in values if v not in (-999, -999.0, None)]
-            if valid:
-                avg = sum(valid) / len(valid)
-                logger.info(f"NASA POWER daily: {avg:.3f} kWh/m²/d "
-                            f"({len(valid)} days, lat={lat}, lng={lng})")
-                return round(avg, 3)
+        resp = await get_client().get(POWER_DAILY_URL, params=daily_params, timeout=20.0)
+        resp.raise_for_status()
+        data = orjson.loads(resp.content)
+
+        values = data["properties"]["parameter"]["ALLSKY_SFC_SW_DWN"].values()
+        # POWER uses -999 as fill value for missing data (filtered in one pass)
+        valid = [v for v in values if v is not None and v != -999]
+        if valid:
+            avg = sum(valid) / len(valid)
+            logger.info(f"NASA POWER daily: {avg:.3f} kWh/m²/d "
+                        f"({len(valid)} days, lat={lat}, lng={lng})")
+            return round(avg, 3)
 
     except Exception as e:
         logger.warning(f"NASA POWER daily endpoint failed ({e}), trying climatology...")
+    return None
+
 
-    # ── 2nd attempt: climatology endpoint (long-term annual average) ───────
+async def _try_climatology(lat: float, lng: float) -> float | None:
+    """Long-term annual average from temporal/climatology/point. None on any failure."""
     clim_params = {
         "parameters": "ALLSKY_SFC_SW_DWN",
         "community": "RE",
@@ -71,31 +167,27 @@ async def fetch_solar_irradiance(lat: float, lng: float) -> float:
     }
 
     try:
-        async with httpx.AsyncClient(timeout=15.0) as client:
-            resp = await client.get(POWER_CLIMATOLOGY_URL, params=clim_params)
-            resp.raise_for_status()
-            data = resp.json()
+        resp = await get_client().get(POWER_CLIMATOLOGY_URL, params=clim_params, timeout=15.0)
+        resp.raise_for_status()
+        data = orjson.loads(resp.content)
 
-            irradiance = (
-                data["properties"]["parameter"]["ALLSKY_SFC_SW_DWN"]["ANN"]
-            )
-            logger.info(f"NASA POWER climatology: {irradiance:.3f} kWh/m²/d "
-                        f"(lat={lat}, lng={lng})")
-            return round(float(irradiance), 3)
+        irradiance = (
+            data["properties"]["parameter"]["ALLSKY_SFC_SW_DWN"]["ANN"]
+        )
+        logger.info(f"NASA POWER climatology: {irradiance:.3f} kWh/m²/d "
+                    f"(lat={lat}, lng={lng})")
+        return round(float(irradiance), 3)
 
     except Exception as e:
-        logger.warning(f"NASA POWER climatology failed ({e}), using estimate.")
+        logger.warning(f"NASA POWER climatology failed ({e}).")
+    return None
 
-    # ── Final fallback: latitude-based estimate ────────────────────────────
-    estimate = _estimate_solar_irradiance(lat)
-    logger.warning(f"Using latitude estimate: {estimate} kWh/m²/d")
-    return estimate
+
+# Upper |lat| bound of each band (inclusive) → kWh/m²/day:
+# tropical, subtropical (India, N. Africa), temperate, subarctic, arctic
+_LAT_BAND_BOUNDS     = (15, 30, 45, 60)
+_LAT_BAND_IRRADIANCE = (6.5, 5.5, 4.0, 2.5, 1.5)
 
 
 def _estimate_solar_irradiance(lat: float) -> float:
-    abs_lat = abs(lat)
-    if abs_lat <= 15:   return 6.5    # Tropical
-    elif abs_lat <= 30: return 5.5    # Subtropical (India, N. Africa)
-    elif abs_lat <= 45: return 4.0    # Temperate
-    elif abs_lat <= 60: return 2.5    # Subarctic
-    else:               return 1.5    # Arctic
+    return _LAT_BAND_IRRADIANCE[bisect_left(_LAT_BAND_BOUNDS, abs(lat))]
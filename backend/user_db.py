@@ -5,7 +5,10 @@ SQLAlchemy models for users, subscriptions, and usage tracking.
 
 import enum
 from datetime import datetime, timezone
-from sqlalchemy import Column, Integer, String, DateTime, Enum as SAEnum, Text, ForeignKey, Boolean
+from sqlalchemy import (
+    Column, Integer, String, DateTime, Enum as SAEnum, Text, ForeignKey, Boolean,
+    UniqueConstraint,
+)
 from database import Base
 
 
@@ -33,6 +36,10 @@ class User(Base):
 class AnalysisUsage(Base):
     """Tracks monthly analysis usage for free-tier quota enforcement (3/month)."""
     __tablename__ = "analysis_usage"
+    __table_args__ = (
+        # Conflict target for the increment_usage UPSERT
+        UniqueConstraint("user_id", "year_month", name="uq_usage_user_month"),
+    )
 
     id         = Column(Integer, primary_key=True, index=True)
     user_id    = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
@@ -46,7 +53,7 @@ class BillingRecord(Base):
 
     id                  = Column(Integer, primary_key=True, index=True)
     user_id             = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
-    razorpay_order_id   = Column(String(100), nullable=False)
+    razorpay_order_id   = Column(String(100), nullable=False, index=True)   # verify_billing lookup
     razorpay_payment_id = Column(String(100), nullable=True)
     amount_paise        = Column(Integer, nullable=False)   # ₹ × 100
     tier_granted        = Column(SAEnum(SubscriptionTier), nullable=False)
@@ -5,8 +5,12 @@ in a single call (efficiency: one HTTP round-trip for all weather data).
 Also adds slope estimation from nearby elevation gradient.
 """
 
-import httpx
 import logging
+from bisect import bisect_left
+
+import orjson
+
+from http_client import get_client
 
 logger = logging.getLogger(__name__)
 
@@ -37,10 +41,9 @@ async def fetch_weather(lat: float, lng: float) -> dict:
     }
 
     try:
-        async with httpx.AsyncClient(timeout=15.0) as client:
-            resp = await client.get(OPEN_METEO_URL, params=params)
-            resp.raise_for_status()
-            data = resp.json()
+        resp = await get_client().get(OPEN_METEO_URL, params=params, timeout=15.0)
+        resp.raise_for_status()
+        data = orjson.loads(resp.content)
 
         hourly = data.get("hourly", {})
 
@@ -71,13 +74,7 @@ async def fetch_weather(lat: float, lng: float) -> dict:
     except Exception as e:
         logger.warning(f"Open-Meteo API failed ({e}), using estimates.")
 
-    return {
-        "wind_speed":      _est_wind(lat),
-        "temperature_c":   _est_temp(lat),
-        "humidity_pct":    _est_humidity(lat),
-        "cloud_cover_pct": _est_cloud(lat),
-        "data_sources":    1,   # only estimates, lower confidence
-    }
+    return _estimated_weather(lat)
 
 
 # ── Legacy shim ───────────────────────────────────────────────────────────────
@@ -87,40 +84,38 @@ async def fetch_wind_speed(lat: float, lng: float) -> float:
 
 
 # ── Satellite-calibrated fallback estimates ───────────────────────────────────
+def _estimated_weather(lat: float) -> dict:
+    """fetch_weather()'s result shape, from latitude estimates alone."""
+    return {
+        "wind_speed":      _est_wind(lat),
+        "temperature_c":   _est_temp(lat),
+        "humidity_pct":    _est_humidity(lat),
+        "cloud_cover_pct": _est_cloud(lat),
+        "data_sources":    1,   # only estimates, lower confidence
+    }
+
+# Upper |lat| bound of each band (inclusive) → climatological value
+_WIND_BOUNDS     = (15, 25, 35, 50, 65)
+_WIND_VALUES     = (3.2, 4.0, 4.8, 5.5, 7.0, 8.5)                 # m/s
+_TEMP_BOUNDS     = (10, 20, 30, 40, 50, 60)
+_TEMP_VALUES     = (28.0, 26.0, 24.0, 18.0, 10.0, 4.0, -5.0)      # °C
+_HUMIDITY_BOUNDS = (10, 20, 30, 40, 55)
+# Tropical, monsoon India, semi-arid / Deccan, then temperate → polar
+_HUMIDITY_VALUES = (80.0, 65.0, 48.0, 55.0, 70.0, 75.0)           # %
+_CLOUD_BOUNDS    = (10, 20, 30, 40, 55)
+# Tropical ITCZ, subtropical dry belt (Rajasthan, Sahara), semi-arid belt
+# (best solar!), Mediterranean / temperate, northern Europe, sub-polar / polar
+_CLOUD_VALUES    = (55.0, 35.0, 30.0, 45.0, 65.0, 75.0)           # %
+
 def _est_wind(lat: float) -> float:
-    a = abs(lat)
-    if a <= 15: return 3.2
-    if a <= 25: return 4.0
-    if a <= 35: return 4.8
-    if a <= 50: return 5.5
-    if a <= 65: return 7.0
-    return 8.5
+    return _WIND_VALUES[bisect_left(_WIND_BOUNDS, abs(lat))]
 
 def _est_temp(lat: float) -> float:
-    a = abs(lat)
-    if a <= 10: return 28.0
-    if a <= 20: return 26.0
-    if a <= 30: return 24.0
-    if a <= 40: return 18.0
-    if a <= 50: return 10.0
-    if a <= 60: return 4.0
-    return -5.0
+    return _TEMP_VALUES[bisect_left(_TEMP_BOUNDS, abs(lat))]
 
 def _est_humidity(lat: float) -> float:
-    a = abs(lat)
-    if a <= 10: return 80.0   # Tropical
-    if a <= 20: return 65.0   # Monsoon India
-    if a <= 30: return 48.0   # Semi-arid / Deccan
-    if a <= 40: return 55.0
-    if a <= 55: return 70.0
-    return 75.0
+    return _HUMIDITY_VALUES[bisect_left(_HUMIDITY_BOUNDS, abs(lat))]
 
 def _est_cloud(lat: float) -> float:
     """Climatological mean cloud cover estimate by latitude."""
-    a = abs(lat)
-    if a <= 10: return 55.0   # Tropical ITCZ
-    if a <= 20: return 35.0   # Subtropical dry belt (Rajasthan, Sahara)
-    if a <= 30: return 30.0   # Semi-arid belt — best solar!
-    if a <= 40: return 45.0   # Mediterranean / temperate
-    if a <= 55: return 65.0   # Northern Europe
-    return 75.0               # Sub-polar / polar — very cloudy
+    return _CLOUD_VALUES[bisect_left(_CLOUD_BOUNDS, abs(lat))]